@@ -0,0 +1,78 @@
+from random import shuffle
+from typing import TYPE_CHECKING, Dict, Hashable, Optional, Tuple
+
+if TYPE_CHECKING:
+    from codenames import KeywordButton, KeywordsView, Team
+
+DEFAULT_ROW_COUNT = 5
+DEFAULT_COLUMN_COUNT = 5
+# The discord limit of row and column is 5 at maximum. 25 buttons at maximum in 1 message.
+
+
+class Board:
+    """
+    Roles and states of keyword panels of a game, which buttons read their roles and flags from.
+    Appearance of buttons (style, label and emoji) is still kept by each button.
+
+    Each keywords view has its own key card, so cells are stored per board key (id of team, side).
+    Side is 0 or 1, fixed when the view is made, so it stays even after roles of players are swapped.
+    Cells are indexed by y * column_count + x in bytearrays.
+    """
+    NEUTRAL, HIT, OVER, RIVAL = range(4)  # Roles
+    SOLVED, FAILED_NEUTRAL = 1, 2  # Flags
+
+    def __init__(self, row_count: int = DEFAULT_ROW_COUNT, column_count: int = DEFAULT_COLUMN_COUNT):
+        self.row_count = row_count
+        self.column_count = column_count
+        self.size = row_count * column_count
+        self.roles: Dict[Hashable, bytearray] = {}
+        self.flags: Dict[Hashable, bytearray] = {}
+        self.remaining_hits: Dict[Hashable, int] = {}
+        self.views: Dict[Hashable, "KeywordsView"] = {}
+
+    @staticmethod
+    def get_key(team: Optional["Team"], side: int) -> Optional[Tuple[int, int]]:
+        return (id(team), side) if team is not None else None
+
+    @staticmethod
+    def get_opposite_key(key: Optional[Tuple[int, int]]) -> Optional[Tuple[int, int]]:
+        if key is None:  # View for spectators has no opposite.
+            return None
+        team_id, side = key
+        return team_id, 1 - side
+
+    def get_index(self, x: int, y: int) -> int:
+        return y * self.column_count + x
+
+    def assign_roles(self, key: Hashable, over_count: int, hit_count: int) -> None:
+        roles = bytearray([self.OVER] * over_count + [self.HIT] * hit_count)
+        roles += bytearray([self.NEUTRAL] * (self.size - len(roles)))
+        shuffle(roles)
+        self.roles[key] = roles
+        self.flags[key] = bytearray(self.size)
+        self.remaining_hits[key] = hit_count
+
+    def get_role(self, key: Hashable, index: int) -> int:
+        return self.roles[key][index]
+
+    def has_flag(self, key: Hashable, index: int, flag: int) -> bool:
+        return bool(self.flags[key][index] & flag)
+
+    def set_flag(self, key: Hashable, index: int, flag: int, value: bool = True) -> None:
+        flags = self.flags[key]
+        was_solved_hit = flags[index] & self.SOLVED and self.roles[key][index] == self.HIT
+        if value:
+            flags[index] |= flag
+        else:
+            flags[index] &= ~flag
+        is_solved_hit = flags[index] & self.SOLVED and self.roles[key][index] == self.HIT
+        self.remaining_hits[key] += bool(was_solved_hit) - bool(is_solved_hit)
+
+    def count_remaining_hits(self, team: "Team") -> int:
+        return sum(self.remaining_hits.get(self.get_key(team, side), 0) for side in (0, 1))
+
+    def get_opposite_button(self, key: Hashable, x: int, y: int) -> Optional["KeywordButton"]:
+        """None for the view for spectators, which has no opposite."""
+        if key is None:
+            return None
+        return self.views[self.get_opposite_key(key)].get_button(x, y)
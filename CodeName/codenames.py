@@ -1,10 +1,11 @@
 import asyncio
 import logging
+import time
 from collections import defaultdict
 from collections.abc import Iterable
 from itertools import cycle
 from random import shuffle
-from typing import Union, Optional, List, Dict, Tuple
+from typing import Awaitable, Callable, Hashable, Union, Optional, List, Dict, Tuple
 
 import discord
 import unicodedata
@@ -12,6 +13,11 @@ from CountDownBot.cogs.avatar_emoji_register import AvatarEmojiRegister
 from CountDownBot.cogs.utils.timers import AioDeltaCountdown, CountdownAsTask
 from CountDownBot.cogs.utils.timers import AioDeltaSleeper
 from discord.ext import commands
+from board import DEFAULT_COLUMN_COUNT, DEFAULT_ROW_COUNT, Board
+from event_queue import EventQueue
+from message_renderer import CachedComponentsMixin, GameChannelTypes, MessageRenderer
+from word_pack_select import WordPackSelect
+from word_pool import DEFAULT_PACK, WORD_PACKS_DIR, WordPack, WordPool, make_board
 
 num_emojis = ['0⃣', '1⃣', '2⃣', '3⃣', '4⃣', '5⃣', '6⃣', '7⃣', '8⃣', '9⃣']
 num_zenkakus = ['０', '１', '２', '３', '４', '５', '６', '７', '８', '９']
@@ -39,9 +45,7 @@ AvatarCogName = AvatarEmojiRegister.__name__
 
 SECONDS_OF_RESEND_MESSAGE = 890
 
-DEFAULT_ROW_COUNT = 5
-DEFAULT_COLUMN_COUNT = 5
-# The discord limit of row and column is 5 at maximum. 25 buttons at maximum in 1 message.
+ROSTER_CONCURRENCY = 4  # Max players whose DM channel and avatar emoji are resolved at once.
 
 DEFAULT_TIME_LIMITS = 50
 
@@ -77,14 +81,15 @@ SPECTATE = "感染"
 SHUFFLE = "シャッフル"
 START = "スタート"
 END_GAME = "ゲーム終了"
+WORD_PACK = "お題パック"
+UNREACHABLE_MESSAGE = "DMを送れなかったよ。DMの受信設定を確認して、もう一度試してね。"
 
-with open("../default_words", encoding="utf-8") as f:
-    DEFAULT_WORDS = f.readlines()
+word_pool = WordPool()  # Packs are loaded once and shared by games.
+word_pool.register_dir(WORD_PACKS_DIR)
 
 EmojiTypes = Union[discord.Emoji, discord.PartialEmoji, str]
 DiscordUserTypes = Union[discord.Member, discord.User]
 GameTypes = Union["GameBase", "CooperativeGame", "VSGame", "BattleRoyalGame"]
-GameChannelTypes = Union[discord.TextChannel, discord.DMChannel]
 
 
 class Player:
@@ -102,16 +107,21 @@ class Player:
         self.keywords_view: Optional[KeywordsView] = None
         self.answer_actions_view: Optional[AnswerActionsView] = None
         self.hint_actions_view: Optional[HintingActionsView] = None
-        self.keyword_message: Optional[discord.Message] = None
-        self.action_message: Optional[discord.Message] = None
+        self.keyword_renderer: MessageRenderer = MessageRenderer()
+        self.action_renderer: MessageRenderer = MessageRenderer()
+        self._render_task: Optional[asyncio.Task] = None
+        self._render_targets: Tuple[bool, bool] = (False, False)  # for_keywords, for_action of the task
 
     @staticmethod
     async def get(member: discord.Member, team: Optional["Team"] = None) -> "Player":
         player = Player(member, team)
-        player.channel = await player.create_channel()
-        player.icon = await player.get_icon()
+        await player.resolve()
         return player
 
+    async def resolve(self) -> None:
+        """Prepare DM channel and avatar emoji concurrently."""
+        self.channel, self.icon = await asyncio.gather(self.create_channel(), self.get_icon())
+
     def __getattr__(self, item):
         return getattr(self.member, item)
 
@@ -125,13 +135,10 @@ class Player:
         await self.show_keyword_message()
 
     async def show_keyword_message(self):
-        keyword_message: discord.Message = self.keyword_message
-        content = self.game.get_game_state(self)
+        self.touch_icon()
+        content = self.game.render_for_side(self, self.game.get_game_state) or ""
         content += self.team.get_remaining_time_str()
-        try:
-            await keyword_message.edit(content=content, view=self.keywords_view)
-        except (discord.errors.HTTPException, AttributeError):
-            self.keyword_message = await self.channel.send(content, view=self.keywords_view)
+        await self.keyword_renderer.render(self.channel, content, self.keywords_view)
 
     async def show_action_message(self):
         if self.is_on_hinter_side:
@@ -140,16 +147,43 @@ class Player:
             action_view = self.answer_actions_view
         else:
             raise Exception(f"Player:{self.name} is not allocated in any team.")
-        sentence = self.game.get_sentence_for_action(self)
+        sentence = self.game.render_for_side(self, self.game.get_sentence_for_action)
 
         if self.game.open_log not in action_view.children:
             if self.game.open_log.options:
                 action_view.add_item(self.game.open_log)
 
-        try:
-            await self.action_message.edit(content=sentence, view=action_view)
-        except (discord.errors.HTTPException, AttributeError) as e:
-            self.action_message = await self.channel.send(sentence, view=action_view) #error code: 50035
+        await self.action_renderer.render(self.channel, sentence, action_view)
+
+    @property
+    def keyword_message(self) -> Optional[discord.Message]:
+        return self.keyword_renderer.message
+
+    @property
+    def action_message(self) -> Optional[discord.Message]:
+        return self.action_renderer.message
+
+    def render(self, for_keywords=True, for_action=True) -> asyncio.Task:
+        """
+        Update game messages in background. Render in progress is cancelled since it is outdated,
+        and messages which it was going to update are updated by new one instead.
+        Only edits are cancelled. A message being sent is finished by MessageRenderer, and edited by new one.
+        """
+        task = self._render_task
+        if task is not None and not task.done():
+            task.cancel()
+            for_keywords = for_keywords or self._render_targets[0]
+            for_action = for_action or self._render_targets[1]
+        self._render_targets = (for_keywords, for_action)
+        self._render_task = asyncio.create_task(self._render(for_keywords, for_action))
+        return self._render_task
+
+    async def _render(self, for_keywords: bool, for_action: bool) -> None:
+        # Both messages are in the same DM channel, which shares 1 rate limit bucket. So one by one.
+        if for_keywords:
+            await self.show_keyword_message()
+        if for_action:
+            await self.show_action_message()
 
     async def show_game_messages(self) -> None:
         asyncio.create_task(self.show_keyword_message())
@@ -168,14 +202,10 @@ class Player:
         asyncio.create_task(add_num_emojis())
 
         def check(reaction, user):
-            if user.bot:
-                return False
-            if reaction.message == message:
-                if reaction.emoji in num_emojis:
-                    return True
+            return reaction.emoji in num_emojis
 
         try:
-            reaction, user = await bot.wait_for("reaction_add", check=check, timeout=20)
+            reaction, user = await router.wait_for_reaction(message, check, timeout=20)
         except asyncio.TimeoutError:
             result = None
         else:
@@ -200,6 +230,12 @@ class Player:
             if avatar_emoji:
                 return str(avatar_emoji)
 
+    def touch_icon(self) -> None:
+        """Tell avatar cog that the icon is still in use, so that it is not evicted."""
+        avatar_cog: AvatarEmojiRegister = bot.get_cog(AvatarCogName)
+        if avatar_cog and self.icon:
+            avatar_cog.touch(self.member)
+
     @property
     def is_on_hinter_side(self) -> bool:
         return self in self.team.players_on_hint
@@ -237,6 +273,105 @@ class Player:
         return False
 
 
+class RosterWarmer:
+    """Resolves players concurrently with bounded parallelism. Each member is resolved only once."""
+
+    def __init__(self, limit: int = ROSTER_CONCURRENCY):
+        self._semaphore = asyncio.Semaphore(limit)
+        self._tasks: Dict[int, asyncio.Task] = {}
+
+    def warm_up(self, player: Player) -> asyncio.Task:
+        """Failed resolution is tried again on next call."""
+        task = self._tasks.get(player.id)
+        if task is None or task.done() and (task.cancelled() or task.exception() is not None):
+            task = self._tasks[player.id] = asyncio.create_task(self._resolve(player))
+        return task
+
+    async def _resolve(self, player: Player) -> Player:
+        async with self._semaphore:
+            await player.resolve()
+        return player
+
+    async def wait(self) -> None:
+        """Wait till all players are resolved."""
+        if self._tasks:
+            await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+
+
+active_games: Dict[int, "GameBase"] = {}  # id of member: the game the member is playing now.
+
+
+def get_active_game(member_id: int) -> Optional["GameBase"]:
+    return active_games.get(member_id)
+
+
+def parse_hint(hint_str: str) -> Tuple[str, Optional[int]]:
+    """Split the amount at the end of the hint. ex. "りんご2" -> ("りんご", 2), "りんご" -> ("りんご", None)"""
+    hint, hint_count = hint_str, None
+    slice_length = 1
+    while len(hint_str) > slice_length:
+        # Repeat since multiple characters might represent number. ex. 12
+        translated = hint_str[-1 * slice_length:].translate(for_std_num_trans)  # 漢数字なども
+        if not translated.isdigit():
+            break
+        hint, hint_count = hint_str[0:-1 * slice_length], int(translated)
+        slice_length += 1
+    return hint, hint_count
+
+
+class EventRouter:
+    """
+    Routes DMs by author to the active game of the author, and reactions by message id to the prompts waiting for them.
+
+    Unlike bot.wait_for, which runs checks of every waiter on every event,
+    each event is looked up in dicts once, however many games are running.
+    """
+
+    def __init__(self):
+        self._reaction_handlers: Dict[int, Callable[[discord.Reaction, DiscordUserTypes], Awaitable[None]]] = {}
+
+    def route_reactions(self, message_id: int,
+                        handler: Callable[[discord.Reaction, DiscordUserTypes], Awaitable[None]]) -> None:
+        self._reaction_handlers[message_id] = handler
+
+    def unroute_reactions(self, message_id: int) -> None:
+        self._reaction_handlers.pop(message_id, None)
+
+    async def wait_for_reaction(self, message: discord.Message,
+                                check: Callable[[discord.Reaction, DiscordUserTypes], bool],
+                                timeout: Optional[float] = None) -> Tuple[discord.Reaction, DiscordUserTypes]:
+        """
+        Raises
+        ------
+        asyncio.TimeoutError
+        """
+        future = asyncio.get_running_loop().create_future()
+
+        async def handler(reaction: discord.Reaction, user: DiscordUserTypes) -> None:
+            if not future.done() and check(reaction, user):
+                future.set_result((reaction, user))
+
+        self.route_reactions(message.id, handler)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self.unroute_reactions(message.id)
+
+    async def on_message(self, message: discord.Message) -> None:
+        if message.author.bot or not isinstance(message.channel, discord.DMChannel):
+            return
+        game = get_active_game(message.author.id)
+        if game is not None:
+            await game.on_input(message)
+
+    async def on_reaction_add(self, reaction: discord.Reaction, user: DiscordUserTypes) -> None:
+        if user.bot:
+            return
+        handler = self._reaction_handlers.get(reaction.message.id)
+        if handler is not None:
+            await handler(reaction, user)
+
+
 class StrLog:
     """Manages logs. """
     hint_template = "ヒント：{keyword} {count}\n"
@@ -371,7 +506,7 @@ class Suggestion(discord.SelectOption):
             if player in current_team.players_on_hint:
                 answer = await self.ask_if_adopt(player)
                 if answer:
-                    await self.game.on_hint(player, self.word)
+                    await self.game.input_hint(player, self.word)
 
     async def ask_if_adopt(self, player) -> Optional[bool]:
         channel = player.channel
@@ -380,22 +515,15 @@ class Suggestion(discord.SelectOption):
             await message.add_reaction(emoji)
 
         def check(reaction: discord.Reaction, user):
-            if reaction.message != message:
-                return False
-            elif user.id != player.id:
-                return False
-            elif reaction.emoji in ["👍", "👎"]:
-                return True
+            return user.id == player.id and reaction.emoji in ["👍", "👎"]
 
+        is_accepted = None
         try:
-            reaction, user = await bot.wait_for("reaction_add", check=check, timeout=20)
+            reaction, user = await router.wait_for_reaction(message, check, timeout=20)
         except asyncio.TimeoutError:
-            is_accepted = None
+            pass
         else:
-            if reaction == "👍":
-                is_accepted = True
-            elif reaction == "👎":
-                is_accepted = False
+            is_accepted = reaction.emoji == "👍"
         finally:
             try:
                 await message.delete()
@@ -415,9 +543,11 @@ class Team:
 
         self.players_on_hint = []
         self.players_on_answer = []
+        self.player_ids: set = set()
+        self.game: Optional[GameTypes] = None  # Set when the game starts.
 
     def __contains__(self, user: Union[discord.User, discord.Member, Player]):
-        return user.id in map(lambda x: x.id, self.players)
+        return user.id in self.player_ids
 
     def allocate_roles(self) -> None:
         for player in self.players:
@@ -431,14 +561,7 @@ class Team:
 
     @property
     def remaining_hit_count(self) -> int:
-        count = 0
-        buttons_of_hinter = self.get_buttons()
-        buttons_of_answerer = self.get_buttons(False)
-        for buttons in [buttons_of_hinter, buttons_of_answerer]:
-            for button in buttons:
-                if button.is_hit and not button.is_solved:
-                    count += 1
-        return count
+        return self.game.board.count_remaining_hits(self)
 
     def get_remaining_time_str(self) -> str:
         minutes, seconds = divmod(self.timer.seconds, 60)
@@ -453,14 +576,16 @@ class Team:
     def append_player(self, player):
         player.team = self
         self.players.append(player)
+        self.player_ids.add(player.id)
 
     def set_view(self, game):
-        for side in [self.players_on_answer, self.players_on_hint]:
-            keywords_view = KeywordsView.get_prepared_view(game, *side)
+        self.game = game
+        for side, players in enumerate([self.players_on_answer, self.players_on_hint]):
+            keywords_view = KeywordsView.get_prepared_view(game, *players, board_key=Board.get_key(self, side))
             answer_actions_view = AnswerActionsView(game)
             hint_actions_view = HintingActionsView(game)
             list_for_suggestions = []
-            for player in side:
+            for player in players:
                 player.keywords_view = keywords_view
                 player.answer_actions_view = answer_actions_view
                 player.hint_actions_view = hint_actions_view
@@ -475,8 +600,7 @@ class Team:
         return sample_player.keywords_view.children
 
     async def lose_game(self):
-        game = self.players[0].game
-        await game.end(loser=self)
+        await self.game.end(loser=self)
 
 
 DEFAULT_SUCCESS_COLOR = discord.ButtonStyle.green
@@ -494,11 +618,6 @@ class KeywordButton(discord.ui.Button['CodeName']):
         self.y = y
         self.label = word
         self.__name = word  # Saves original name here, since label might change during game.
-        self.is_over = False
-        self.is_rival_side = False
-        self.is_hit = False
-        self.is_solved = False
-        self.is_failed_neutral = False
 
         self.success_color = success_color or DEFAULT_SUCCESS_COLOR
         self.game_over_color = game_over_color or DEFAULT_GAME_OVER_COLOR
@@ -507,15 +626,18 @@ class KeywordButton(discord.ui.Button['CodeName']):
 
     async def callback(self, interaction: discord.Interaction):
         await interaction.response.defer()
+        self.game.submit(self.on_click, interaction.user)
+
+    async def on_click(self, author: DiscordUserTypes):
+        """Handled in event queue of the game, so clicks are applied one by one."""
         game: GameTypes = self.game
         if game.is_over:
             return
 
-        author = interaction.user
         player = game.get_player(author.id)
         if player is None:
-            spectator = await Player.get(author)
-            game.spectators.append(spectator)
+            player = await Player.get(author)
+            game.add_spectator(player)
 
         if player.is_on_check_mode:
             self.style_checked(player)
@@ -551,13 +673,13 @@ class KeywordButton(discord.ui.Button['CodeName']):
             return self.game.EMOJI_NEUTRAL
 
     def style_solved(self):
-        for button in [self, self.opposite]:
+        for button in self.mirrored:
             button.disabled = True
             button.style = self.success_color
             button.is_solved = True
 
     def style_checked(self, player):
-        for button in [self, self.opposite]:
+        for button in self.mirrored:
             if button.emoji is None:
                 button.emoji = player.icon
             elif button.emoji == player.icon:
@@ -566,7 +688,7 @@ class KeywordButton(discord.ui.Button['CodeName']):
                 button.emoji = MANY_PERSONS_EMOJI
 
     def style_game_over(self):
-        for button in [self, self.opposite]:
+        for button in self.mirrored:
             button.disabled = True
             button.style = self.game_over_color
             button.emoji = self.game.EMOJI_GAME_OVER
@@ -576,17 +698,17 @@ class KeywordButton(discord.ui.Button['CodeName']):
         self.style = self.rival_color
 
     def set_neutral(self, player):
-        if self.opposite.is_failed_neutral:
-            for button in [self, self.opposite]:
+        opposite = self.opposite
+        if opposite is not None and opposite.is_failed_neutral:
+            for button in self.mirrored:
                 button.disabled = True
                 button.emoji = "🔛"
             return
 
-        self.emoji = player.icon
-        self.label = self.name + GOT_FAILED_EMOJI
+        for button in self.mirrored:
+            button.emoji = player.icon
+            button.label = button.name + GOT_FAILED_EMOJI
         self.is_failed_neutral = True
-        self.opposite.label = self.opposite.name + GOT_FAILED_EMOJI
-        self.opposite.emoji = player.icon
 
     def set_color_for_coop(self):
         if self.is_hit:
@@ -621,33 +743,68 @@ class KeywordButton(discord.ui.Button['CodeName']):
         return width
 
     @property
-    def opposite(self) -> "KeywordButton":
-        players = self.view.players
-        team = players[0].team
-        if players == team.players_on_hint:
-            opposite_players = team.players_on_answer
-        elif players == team.players_on_answer:
-            opposite_players = team.players_on_hint
-        else:
-            raise InvalidTeams("Failed to find opposite_players.")
-        sample_player = opposite_players[0]
-        opposite_button = sample_player.keywords_view.get_button(self.x, self.y)
-        return opposite_button
+    def opposite(self) -> Optional["KeywordButton"]:
+        """The same keyword on the other side of the team. None on the view for spectators."""
+        return self.game.board.get_opposite_button(self.view.board_key, self.x, self.y)
+
+    @property
+    def mirrored(self) -> List["KeywordButton"]:
+        """This button and its opposite, which are styled together."""
+        opposite = self.opposite
+        return [self] if opposite is None else [self, opposite]
+
+    @property
+    def board_key(self) -> Hashable:
+        return self.view.board_key
+
+    @property
+    def index(self) -> int:
+        return self.game.board.get_index(self.x, self.y)
+
+    @property
+    def is_hit(self) -> bool:
+        return self.game.board.get_role(self.board_key, self.index) == Board.HIT
+
+    @property
+    def is_over(self) -> bool:
+        return self.game.board.get_role(self.board_key, self.index) == Board.OVER
+
+    @property
+    def is_rival_side(self) -> bool:
+        return self.game.board.get_role(self.board_key, self.index) == Board.RIVAL
+
+    @property
+    def is_solved(self) -> bool:
+        return self.game.board.has_flag(self.board_key, self.index, Board.SOLVED)
+
+    @is_solved.setter
+    def is_solved(self, value: bool) -> None:
+        self.game.board.set_flag(self.board_key, self.index, Board.SOLVED, value)
+
+    @property
+    def is_failed_neutral(self) -> bool:
+        return self.game.board.has_flag(self.board_key, self.index, Board.FAILED_NEUTRAL)
+
+    @is_failed_neutral.setter
+    def is_failed_neutral(self, value: bool) -> None:
+        self.game.board.set_flag(self.board_key, self.index, Board.FAILED_NEUTRAL, value)
 
     @property
     def name(self) -> str:
         return self.__name
 
 
-class KeywordsView(discord.ui.View):
+class KeywordsView(CachedComponentsMixin, discord.ui.View):
     children: List[KeywordButton]
 
     def __init__(self, words: List[str], game: "GameTypes",
-                 *players: Player, row_count: Optional[int] = None, column_count: Optional[int] = None):
+                 *players: Player, row_count: Optional[int] = None, column_count: Optional[int] = None,
+                 board_key: Hashable = None):
         super().__init__(timeout=None)
         self.words = words
         self.game: GameTypes = game
         self.players = list(players)
+        self.board_key: Hashable = board_key
         self.row_count = row_count or DEFAULT_ROW_COUNT
         self.column_count = column_count or DEFAULT_COLUMN_COUNT
 
@@ -659,30 +816,18 @@ class KeywordsView(discord.ui.View):
                 self.add_item(button)
 
     @classmethod
-    def get_prepared_view(cls, game, *players) -> "KeywordsView":
-        view = cls(game.words, game, *players)
+    def get_prepared_view(cls, game, *players, board_key: Hashable = None) -> "KeywordsView":
+        view = cls(game.words, game, *players, board_key=board_key)
+        game.board.views[board_key] = view
         view.factory_buttons()
         view.set_status_for_buttons()
         view.set_colors()
         return view
 
-    def set_status_for_buttons(self, over_count=None, hit_count=None, all_panels_count=None):
+    def set_status_for_buttons(self, over_count=None, hit_count=None):
         over_count = over_count or self.game.over_panel_count
         hit_count = hit_count or self.game.hit_panel_count
-        all_panels_count = all_panels_count or DEFAULT_ROW_COUNT * DEFAULT_COLUMN_COUNT
-        list_ = [0] * over_count + [1] * hit_count
-        pudding_count = all_panels_count - len(list_)
-        puddings = [2] * pudding_count
-        list_ += puddings
-        shuffle(list_)
-        for y in range(self.row_count):
-            for x in range(self.column_count):
-                button = self.get_button(x, y)
-                status = list_[y * 5 + x]
-                if status == 0:
-                    button.is_over = True
-                elif status == 1:
-                    button.is_hit = True
+        self.game.board.assign_roles(self.board_key, over_count, hit_count)
 
     def set_colors(self):
         buttons = self.children
@@ -698,13 +843,13 @@ class KeywordsView(discord.ui.View):
         if isinstance(num, Iterable):
             num = iter(num)
             x, y = next(num), next(num)
-            return self.children[y * 5 + x]
+            return self.children[y * self.column_count + x]
         else:
             return self.children[num]
 
     def get_button(self, x, y):
         # x, y = 0, 0
-        return self.children[y * 5 + x]
+        return self.children[y * self.column_count + x]
 
 
 class GameBase:
@@ -714,16 +859,16 @@ class GameBase:
     EMOJI_NEUTRAL = "❌"
     EMOJI_RIVAL_BUTTON = "😈"
     EMOJI_GAME_OVER = "☠️"
+    BATCH_SECONDS = 0.1  # Events within this window after the first one are rendered together.
 
     def __init__(self, *teams: Team, words=None, **kwargs):
         super().__init__()
-        self.keywords_messages: Dict[int: discord.Message] = dict()
-        self.action_messages: Dict[Player: discord.Message] = dict()
         self.spectators_view = None
         self.delta_timer = None
         self.resend_task: Optional[AioDeltaCountdown] = None
         self.teams: Union[List[Team]] = list(teams)
-        self.spectators: Optional[List[Player]] = None
+        self.spectators: List[Player] = []
+        self.players_by_id: Dict[int, Player] = {player.id: player for team in self.teams for player in team.players}
 
         def get_next_team():
             cycled_teams = cycle(self.teams)
@@ -736,7 +881,9 @@ class GameBase:
         self.over_panel_count = self.GAME_OVER_PANELS_COUNT
         self.row_count = kwargs.get("row", None) or kwargs.get("row_count", None) or DEFAULT_ROW_COUNT
         self.column_count: int = kwargs.get("column", None) or kwargs.get("column_count", None) or DEFAULT_COLUMN_COUNT
+        self.board: Board = Board(self.row_count, self.column_count)
 
+        self.word_pack: str = kwargs.get("word_pack", None) or DEFAULT_PACK
         self.words: List[List[str]] = self.screen_words(words)
         self.hint: Optional[str] = None
         self.hint_count: Optional[int] = None
@@ -745,9 +892,12 @@ class GameBase:
         self.log_for_review: Optional[StrLog] = StrLog(self)
 
         self.is_over = False
+        self.events: EventQueue = EventQueue(self.update_game_messages, self.BATCH_SECONDS)
+        self.events_task: Optional[asyncio.Task] = None
+        self.version = 0  # Bumped on every update of game messages. Renders are cached per version.
+        self._render_cache: Dict[Tuple, str] = {}
 
-        self.wait_input_task = None
-        self.wait_emoji_task = None
+        self.evaluated_message_ids: List[int] = []  # Asking messages routed to wait_for_evaluations.
         self.edit_every_second_task = None
 
     @property
@@ -766,72 +916,56 @@ class GameBase:
                 team.timer.run_count_task()
             for player in team.players:
                 player.game = self
+                active_games[player.id] = self
                 await player.show_game_messages()
         self.edit_every_second_task = asyncio.create_task(self.keep_updating_timer())
         self.resend_task = asyncio.create_task(self.resend_messages())
-        self.wait_input_task = asyncio.create_task(self.wait_input())
-
-    async def wait_input(self):
-        def check(message):
-            if message.author.bot:
-                return False
-            all_players_id = [player.id for team in self.teams for player in team.players]
-            if message.author.id in all_players_id:
-                player = self.get_player(message.author.id)
-                if message.channel == player.channel:
-                    return True
-            return False
-
-        while True:
-            try:
-                message = await bot.wait_for("message", check=check, timeout=3600)
-            except asyncio.TimeoutError:
-                if self.is_over:
-                    return
-                else:
-                    self.wait_input_task = asyncio.create_task(self.wait_input())
-            else:
-                await self.on_input(message)
+        self.events_task = asyncio.create_task(self.consume_events())
+
+    def submit(self, handler: Callable[..., Awaitable[None]], *args, **kwargs) -> None:
+        """Queue an event. Events mutate the game one by one in the order they came."""
+        self.events.submit(handler, *args, **kwargs)
+
+    async def consume_events(self):
+        """
+        Handle events in batches. Events which come within BATCH_SECONDS after the first one join the batch,
+        and game messages are updated once after the batch, even if the batch ended the game.
+        """
+        while not self.is_over:
+            await self.events.handle_batch()
+
+    def stop_waiting(self):
+        """DMs stop coming to on_input when the players are removed from active_games."""
+        for message_id in self.evaluated_message_ids:
+            router.unroute_reactions(message_id)
+        self.evaluated_message_ids.clear()
 
     async def on_input(self, message: discord.Message):
+        """Waits for players here, before queuing, so that events are never blocked on them."""
         player = self.get_player(message.author.id)
+        if player is None or message.channel != player.channel:
+            return
         if player.is_on_suggest_mode:
-            await self.on_suggest(player, message)
+            suggestion = Suggestion(message, self)
+            self.submit(self.on_suggest, player, suggestion)
+            await self.ask_evaluations(player, suggestion)
         else:
-            await self.on_hint(player, message.content)
+            await self.input_hint(player, message.content)
 
-    async def on_hint(self, player: Player, hint_str: str) -> None:
-
-        slice_length = 1
-        while len(hint_str) >= slice_length:
-            # Repeat since multiple characters might represent number. ex. 12
-            if self.hint_count is None:
-                try:
-                    translated = hint_str[-1 * slice_length:].translate(for_std_num_trans)  # 漢数字なども
-                    self.hint_count = int(translated)
-                except ValueError:
-                    break
-                else:
-                    self.hint = hint_str[0:-1 * slice_length]
-            slice_length += 1
-
-        if self.hint_count is None:
-            self.hint = hint_str
-            self.hint_count = await player.ask_amount()
+    async def input_hint(self, player: Player, hint_str: str) -> None:
+        hint, hint_count = parse_hint(hint_str)
+        if hint_count is None:
+            hint_count = await player.ask_amount()
+        self.submit(self.on_hint, player, hint, hint_count)
 
+    async def on_hint(self, player: Player, hint: str, hint_count: Optional[int]) -> None:
+        self.hint, self.hint_count = hint, hint_count
         self.add_log(player)
         await self.update_game_messages(for_keywords=False)
 
-    async def on_suggest(self, player: Player, message_by_player):
-        team = player.team
-        hint_side_players = team.players_on_hint[::]  # copy to prevent bugs when the role of team members swap.
-        sentence = f"「{message_by_player.content}」　が提案されました。"
-        embed = discord.Embed(colour=714270)
-        embed.set_author(name=player.nick or player.name, icon_url=player.icon.url)
-        sample_player: Player = hint_side_players[0]
-
+    async def on_suggest(self, player: Player, suggestion: "Suggestion"):
+        sample_player: Player = player.team.players_on_hint[0]
         hint_view: HintingActionsView = sample_player.hint_actions_view
-        suggestion = Suggestion(message_by_player, self)
         if not sample_player.suggested_hints:  # if they still cannot see the suggestions log yet
             select_suggestion = discord.ui.Select(placeholder=SUGGEST_LOG_PLACEHOLDER, row=SUGGEST_LOG_ROW,
                                                   options=[suggestion])
@@ -840,57 +974,46 @@ class GameBase:
             suggestions_log: discord.SelectMenu = hint_view.get_suggestions_log()
             suggestions_log.options.append(suggestion)
         player.suggested_hints.append(suggestion)
+        await self.update_game_messages(for_keywords=False)
+
+    async def ask_evaluations(self, player: Player, suggestion: "Suggestion"):
+        hint_side_players = player.team.players_on_hint[::]  # copy to prevent bugs when the role of team members swap.
+        sentence = f"「{suggestion.word}」　が提案されました。"
+        embed = discord.Embed(colour=714270)
+        embed.set_author(name=player.nick or player.name, icon_url=player.icon.url)
         asking_messages = []
-        for player in hint_side_players:
-            asking_message: discord.Message = await player.channel.send(sentence, embed=embed)
+        for hint_side_player in hint_side_players:
+            asking_message: discord.Message = await hint_side_player.channel.send(sentence, embed=embed)
             for emoji in ["👍", "👎"]:
                 await asking_message.add_reaction(emoji)
             asking_messages.append(asking_message)
 
-        self.wait_emoji_task = asyncio.create_task(self.wait_for_evaluations(player, asking_messages))
+        self.wait_for_evaluations(suggestion, asking_messages)
 
-    async def wait_for_evaluations(self, player, target_messages: List[discord.Message]):
+    def wait_for_evaluations(self, suggestion: "Suggestion", target_messages: List[discord.Message]):
+        """Route reactions on asking messages. Each message is evaluated once, then deleted."""
 
-        def check(reaction: discord.Reaction, user):
-            if user.bot:
-                return False
-            if reaction.message in target_messages:
-                if reaction.emoji in ["👍", "👎"]:
-                    return True
-            return False
-
-        while True:
-            try:
-                reaction, user = await bot.wait_for("reaction_add", check=check, timeout=3600)
-            except asyncio.TimeoutError:
-                if self.is_over:
-                    return
-                else:
-                    self.wait_emoji_task = asyncio.create_task(self.wait_input())
-            except asyncio.CancelledError:
+        async def on_reaction(reaction: discord.Reaction, _):
+            if reaction.emoji not in ["👍", "👎"]:
                 return
-            else:
-                message_for_reaction = reaction.message
-                suggestions = player.suggested_hints
-                try:
-                    def includes_suggestion(s):
-                        return s.word in message_for_reaction.content.split(" ")[0]
+            router.unroute_reactions(reaction.message.id)
+            self.submit(self.on_evaluation, suggestion, reaction.emoji)
+            try:
+                await reaction.message.delete()
+            except discord.errors.HTTPException:
+                pass
 
-                    filtered = filter(includes_suggestion, suggestions)
-                    suggestion: Suggestion = list(filtered)[0]
-                except (IndexError, KeyError) as e:
-                    logger.warning(f"Suggestion was not found. {user.name}, {e}")
-                else:
-                    if reaction.emoji == "👍":
-                        suggestion.good += 1
-                    elif reaction.emoji == "👎":
-                        suggestion.bad += 1
-                    suggestion.label = suggestion.get_label()
-                finally:
-                    try:
-                        await reaction.message.delete()
-                    except discord.errors.HTTPException:
-                        pass
+        for message in target_messages:
+            router.route_reactions(message.id, on_reaction)
+            self.evaluated_message_ids.append(message.id)
+
+    async def on_evaluation(self, suggestion: "Suggestion", emoji: str):
+        if emoji == "👍":
+            suggestion.good += 1
+        elif emoji == "👎":
+            suggestion.bad += 1
+        suggestion.label = suggestion.get_label()
+        await self.update_game_messages(for_keywords=False)
 
     async def on_success(self, player: Player):
         if player.team.remaining_hit_count == 0:
@@ -905,8 +1028,7 @@ class GameBase:
             sample_answerer: Player = team.players_on_answer[0]
             rival_button = sample_answerer.keywords_view.get_button(x, y)
             if rival_button.is_hit:
-                rival_button.style_solved()
-                rival_button.opposite.style_solved()
+                rival_button.style_solved()  # Its opposite too.
             else:
                 rival_button.set_rival_style()
         await self.advance_turn(prioritized_player=player)
@@ -929,33 +1051,56 @@ class GameBase:
         with AioDeltaSleeper() as delta_sleeper:
             while not self.is_over:
                 await delta_sleeper.wait(2)
-                for player in self.current_team.players:
-                    await player.update_timer()
+                # Through render, so the timer never races with updates of the same messages.
+                renders = [player.render(for_action=False) for player in self.current_team.players]
+                await asyncio.gather(*renders, return_exceptions=True)
 
     async def resend_messages(self):
         while not self.is_over:
             await asyncio.sleep(SECONDS_OF_RESEND_MESSAGE)
-            for messages in [self.keywords_messages.values(), self.action_messages.values()]:
-                for message in messages:
-                    asyncio.create_task(message.delete())
             for team in self.teams:
                 for player in team.players:
+                    for renderer in [player.keyword_renderer, player.action_renderer]:
+                        message = renderer.message
+                        renderer.forget()
+                        if message is not None:
+                            asyncio.create_task(message.delete())
                     asyncio.create_task(player.show_game_messages())
 
+    def bump_version(self) -> None:
+        self.version += 1
+        self._render_cache.clear()
+
+    def render_for_side(self, player: Player, render: Callable[[Player], str]) -> str:
+        """Content depends only on team and side of the player, so render it once per side in this version."""
+        key = (render.__name__, id(player.team), player.is_on_hinter_side, self.version)
+        try:
+            return self._render_cache[key]
+        except KeyError:
+            content = self._render_cache[key] = render(player)
+            return content
+
     async def update_game_messages(self, for_keywords=True, for_action=True, prioritized_player: Player = None):
+        """
+        Update the prioritized player first, who made the change, then the others concurrently.
+        While handling a batch of events, this only merges the request, and messages are updated after the batch.
+        """
+        if self.events.merge(for_keywords=for_keywords, for_action=for_action, prioritized_player=prioritized_player):
+            return
+        self.bump_version()
+        started = time.perf_counter()
         if prioritized_player:
-            if for_keywords:
-                await prioritized_player.show_keyword_message()
-            if for_action:
-                await prioritized_player.show_action_message()
-        for team in self.teams:
-            for player in team.players:
-                if player is prioritized_player:
-                    continue
-                if for_keywords:
-                    await player.show_keyword_message()
-                if for_action:
-                    await player.show_action_message()
+            # Gathered, since the render is cancelled if another update supersedes it.
+            await asyncio.gather(prioritized_player.render(for_keywords, for_action), return_exceptions=True)
+        prioritized_latency = time.perf_counter() - started
+        renders = [player.render(for_keywords, for_action)
+                   for team in self.teams for player in team.players if player is not prioritized_player]
+        results = await asyncio.gather(*renders, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning(f"Failed to update game message. {result}")
+        logger.debug(f"Updated game messages of {len(renders) + bool(prioritized_player)} players "
+                     f"in {time.perf_counter() - started:.3f}s (prioritized player in {prioritized_latency:.3f}s).")
 
     def get_game_state(self, player: Player) -> str:  # This method should be overwritten by each game mode.
         # remaining_hit_count = player.team.remaining_hit_count
@@ -990,25 +1135,10 @@ class GameBase:
                 sentence += "相手チームが暗号を作成中だよ"
         return sentence
 
-    def screen_words(self, words) -> List[List[str]]:
-        unscreened_words = words or DEFAULT_WORDS
-        words: List[List[str]] = [[""] * self.column_count for _ in range(self.row_count)]  # 2D_list(5*5)
-        shuffle(unscreened_words)
-        for y in range(self.row_count):
-            for x in range(self.column_count):
-                selected_word = unscreened_words.pop()
-                while not self.filter_word(selected_word):
-                    selected_word: str = unscreened_words.pop()
-                if self.filter_word(selected_word):
-                    words[y][x] = selected_word
-        return words
-
-    @staticmethod
-    def filter_word(word):
-        if len(word) > 5:
-            return False
-        else:
-            return True
+    def screen_words(self, words=None) -> List[List[str]]:
+        """Draw words for the board from the given words, or from the word pack of this game."""
+        pack = WordPack("custom", words) if words else word_pool.get(self.word_pack)
+        return make_board(pack, self.row_count, self.column_count)
 
     @staticmethod
     def arrange_word(word):
@@ -1027,19 +1157,30 @@ class GameBase:
         self.log_for_review.on_advance_turn()
         await self.update_game_messages(prioritized_player=prioritized_player)
 
-    def get_player(self, id_: int) -> Player:
-        for team in self.teams:
-            for player in team.players:
-                if player.id == id_:
-                    return player
-        for player in self.spectators:
-            if player.id == id_:
-                return player
+    def get_player(self, id_: int) -> Optional[Player]:
+        """Players of teams and spectators."""
+        return self.players_by_id.get(id_)
+
+    def get_active_player(self, id_: int) -> Optional[Player]:
+        """Player of teams, only while the member is playing this game. Views of ended games are ignored by this."""
+        if get_active_game(id_) is not self:
+            return None
+        return self.players_by_id.get(id_)
+
+    def add_spectator(self, player: Player) -> None:
+        player.game = self
+        self.spectators.append(player)
+        self.players_by_id.setdefault(player.id, player)
 
     async def end(self, winner=None, loser=None):
         self.is_over = True
-        for task in [self.resend_task, self.edit_every_second_task, self.wait_emoji_task, self.wait_input_task]:
-            if task is not None:
+        self.stop_waiting()
+        for team in self.teams:
+            for player in team.players:
+                if active_games.get(player.id) is self:
+                    del active_games[player.id]
+        for task in [self.resend_task, self.edit_every_second_task, self.events_task]:
+            if task is not None and task is not asyncio.current_task():  # Ending can be an event itself.
                 task.cancel()  # must catch some exceptions
         # await self.update_game_messages()
         if winner is None:
@@ -1056,8 +1197,8 @@ class GameBase:
 class CooperativeGame(GameBase):
     DEFAULT_TURNS = DEFAULT_TURNS
 
-    def __init__(self, *teams, words):
-        super().__init__(*teams, words=words)
+    def __init__(self, *teams, words, **kwargs):
+        super().__init__(*teams, words=words, **kwargs)
         self.remaining_turns = self.DEFAULT_TURNS
 
     async def advance_turn(self, prioritized_player: Player = None):
@@ -1108,7 +1249,7 @@ def defer_response(coro):
     return inner
 
 
-class AnswerActionsView(discord.ui.View):
+class AnswerActionsView(CachedComponentsMixin, discord.ui.View):
     children: List[discord.Component]
 
     def __init__(self, game: "GameTypes", log: Optional[discord.ui.Select] = None):
@@ -1120,15 +1261,20 @@ class AnswerActionsView(discord.ui.View):
     @discord.ui.button(label=TURN_END, style=discord.ButtonStyle.primary)
     @defer_response
     async def end_turn(self, _, interaction: discord.Interaction):
-        author = interaction.user
-        player = self.game.get_player(author.id)
-        await self.game.advance_turn(prioritized_player=player)
+        player = self.game.get_active_player(interaction.user.id)
+        if player is None:
+            return
+        self.game.submit(self.game.advance_turn, prioritized_player=player)
 
     @discord.ui.button(label=CHECK, style=discord.ButtonStyle.primary)
     @defer_response
     async def check_mode(self, button, interaction: discord.Interaction):
-        author = interaction.user
-        player = self.game.get_player(author.id)
+        player = self.game.get_active_player(interaction.user.id)
+        if player is None:
+            return
+        self.game.submit(self.toggle_check_mode, button, player)
+
+    async def toggle_check_mode(self, button, player: Player):
         player.is_on_check_mode = not player.is_on_check_mode
         if button.label == CHECK:
             button.label = END_CHECK
@@ -1137,7 +1283,7 @@ class AnswerActionsView(discord.ui.View):
         await self.game.update_game_messages()
 
 
-class HintingActionsView(discord.ui.View):
+class HintingActionsView(CachedComponentsMixin, discord.ui.View):
     def __init__(self, game):
         super().__init__(timeout=None)
         self.game = game
@@ -1145,8 +1291,12 @@ class HintingActionsView(discord.ui.View):
     @discord.ui.button(label=SUGGESTION, style=discord.ButtonStyle.primary)
     @defer_response
     async def propose(self, button, interaction: discord.Interaction):
-        author = interaction.user
-        player = self.game.get_player(author.id)
+        player = self.game.get_active_player(interaction.user.id)
+        if player is None:
+            return
+        self.game.submit(self.toggle_suggest_mode, button, player)
+
+    async def toggle_suggest_mode(self, button, player: Player):
         if button.label == SUGGESTION:
             player.is_on_suggest_mode = True
             button.label = STOP_SUGGESTION
@@ -1158,8 +1308,12 @@ class HintingActionsView(discord.ui.View):
     @discord.ui.button(label=HINT, style=discord.ButtonStyle.primary)
     @defer_response
     async def hint(self, _, interaction: discord.Interaction):
-        author = interaction.user
-        player = self.game.get_player(author.id)
+        player = self.game.get_active_player(interaction.user.id)
+        if player is None:
+            return
+        self.game.submit(self.toggle_input_mode, player)
+
+    async def toggle_input_mode(self, player: Player):
         player.is_on_suggest_mode = not player.is_on_suggest_mode
 
     def get_suggestions_log(self):
@@ -1204,8 +1358,34 @@ class OpeningView(discord.ui.View):
                 team.allocate_roles()
         self.started = False
         self.words = None
+        self.word_pack = DEFAULT_PACK  # Name of pack registered in word_pool.
         self.specified_mode = None
         self.opening_message = None
+        self.roster = RosterWarmer()
+        WordPackSelect.add_if_choosable(word_pool, self, placeholder=WORD_PACK)
+        self._needs_refresh = False
+        self._refresh_lock = asyncio.Lock()
+
+    async def warm_up_roster(self) -> None:
+        """Fill in icons of players on opening message as soon as each of them is resolved."""
+        tasks = [self.roster.warm_up(player) for player in self.players]
+        for task in asyncio.as_completed(tasks):
+            try:
+                await task
+            except discord.errors.HTTPException as e:
+                logger.warning(e)
+            else:
+                await self.refresh_message()
+
+    async def refresh_message(self) -> None:
+        """Edit opening message. Requests while editing are coalesced into one more edit."""
+        self._needs_refresh = True
+        if self._refresh_lock.locked() or self.started:
+            return
+        async with self._refresh_lock:
+            while self._needs_refresh:
+                self._needs_refresh = False
+                await self.opening_message.edit(content=self.build_start_sentence(), view=self)
 
     def set_random_teams(self):
         self.teams = []
@@ -1276,22 +1456,45 @@ class OpeningView(discord.ui.View):
         author = interaction.user
         member = guild.get_member(author.id)
         if member not in self.players:
-            player = await Player.get(member=member)
+            player = Player(member)
             self.players.append(player)
             if not self.specified_mode:
                 self.set_random_teams()
-            sentence = self.build_start_sentence()
-            await self.opening_message.edit(content=sentence, view=self)
+            await self.refresh_message()
+            try:
+                await self.roster.warm_up(player)
+            except discord.errors.HTTPException as e:
+                logger.warning(e)
+                await interaction.followup.send(UNREACHABLE_MESSAGE, ephemeral=True)
+            else:
+                await self.refresh_message()
 
     @discord.ui.button(label=START, style=discord.ButtonStyle.green)
     async def start(self, _, interaction: discord.Interaction):
+        await interaction.response.defer()  # Resolving players may take longer than interaction allows.
         try:
-            game = self.current_game_mode(*self.teams, words=self.words)
+            game = self.current_game_mode(*self.teams, words=self.words, word_pack=self.word_pack)
         except InvalidTeams as e:
             logger.info(e)
-        else:
-            await game.start()
-            await interaction.response.edit_message(content="ゲーム用DMを送ったよ！", view=None)
+            return
+        except KeyError:  # Pack is not registered in word_pool.
+            await interaction.followup.send(f"お題パック「{self.word_pack}」が見つからないよ。", ephemeral=True)
+            return
+        except ValueError:  # Pack doesn't have enough words for the board.
+            await interaction.followup.send("盤面を埋めるだけのお題の単語が足りないよ。", ephemeral=True)
+            return
+        self.started = True
+        for player in self.players:
+            self.roster.warm_up(player)  # Retries players failed to resolve before.
+        await self.roster.wait()  # DM channels are required to start.
+        unreachable = [player for player in self.players if player.channel is None]
+        if unreachable:
+            self.started = False
+            names = "、".join(player.name for player in unreachable)
+            await self.opening_message.edit(content=f"{names}: {UNREACHABLE_MESSAGE}", view=self)
+            return
+        await game.start()
+        await self.opening_message.edit(content="ゲーム用DMを送ったよ！", view=None)
 
     @discord.ui.button(label=SHUFFLE, style=discord.ButtonStyle.primary)
     async def shuffle(self, _, interaction: discord.Interaction):
@@ -1309,6 +1512,9 @@ intents = discord.Intents.all()
 bot = discord.ext.commands.Bot("$", intents=intents)
 avatar_register_cog = AvatarEmojiRegister(bot)
 bot.add_cog(avatar_register_cog)
+router = EventRouter()
+bot.add_listener(router.on_message)
+bot.add_listener(router.on_reaction_add)
 
 sample_view = None
 
@@ -1342,7 +1548,7 @@ async def play(ctx: commands.Context, members=None):
 
     host = ctx.author
     try:
-        members = members or ctx.author.voice.channel.players
+        members = members or ctx.author.voice.channel.members
     except AttributeError:
         members = [ctx.author]
     else:
@@ -1354,13 +1560,11 @@ async def play(ctx: commands.Context, members=None):
             members = set([host] + members)
 
         locate_host_first()
-    players = [await Player.get(member) for member in members]
+    players = [Player(member) for member in members]
     opening = OpeningView(*players)
-    if opening.players:
-        for player in opening.players:
-            player.icon = await player.get_icon()
-    message = await ctx.send(opening.build_start_sentence(), view=opening)
+    message = await ctx.send(opening.build_start_sentence(), view=opening)  # Icons are filled in later.
     opening.opening_message = message
+    await opening.warm_up_roster()
 
 
 try:
@@ -0,0 +1,75 @@
+import asyncio
+import logging
+from functools import partial
+from typing import Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+Event = Callable[[], Awaitable[None]]
+
+
+class EventQueue:
+    """
+    Handles events of a game one by one in the order they came, in batches.
+
+    Events which come within batch_seconds after the first one join the batch.
+    Updates requested by the events are merged while handling the batch, and flushed once after it.
+
+    Examples
+    --------
+    events = EventQueue(game.update_game_messages)
+    events.submit(button.on_click, user)
+    await events.handle_batch()
+    """
+    DEFAULT_BATCH_SECONDS = 0.1
+
+    def __init__(self, flush: Callable[..., Awaitable[None]], batch_seconds: float = DEFAULT_BATCH_SECONDS):
+        """
+        Parameters
+        ----------
+        flush : Callable[..., Awaitable[None]]
+            Called with merged keyword arguments of the updates requested in a batch.
+        """
+        self.flush: Callable[..., Awaitable[None]] = flush
+        self.batch_seconds: float = batch_seconds
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._batched_update: Optional[Dict] = None
+
+    def submit(self, handler: Callable[..., Awaitable[None]], *args, **kwargs) -> None:
+        self._queue.put_nowait(partial(handler, *args, **kwargs))
+
+    def merge(self, **update) -> bool:
+        """
+        Merge the update into the batch being handled. Each argument is kept once truthy.
+
+        Returns
+        -------
+        bool
+            False if no batch is being handled. Then the caller should update by itself.
+        """
+        if self._batched_update is None:
+            return False
+        for key, value in update.items():
+            self._batched_update[key] = self._batched_update.get(key) or value
+        return True
+
+    async def handle_batch(self) -> None:
+        """Wait for the next event, handle it and the ones which came during the batch, then flush."""
+        event = await self._queue.get()
+        self._batched_update = {}
+        try:
+            await self._handle(event)
+            await asyncio.sleep(self.batch_seconds)
+            while not self._queue.empty():
+                await self._handle(self._queue.get_nowait())
+        finally:
+            update, self._batched_update = self._batched_update, None
+        if update:
+            await self.flush(**update)
+
+    @staticmethod
+    async def _handle(event: Event) -> None:
+        try:
+            await event()
+        except Exception as e:  # One broken event must not stop the game.
+            logger.exception(e)
@@ -0,0 +1,121 @@
+import asyncio
+import json
+from typing import Dict, Hashable, List, Optional, Tuple, Union
+
+import discord
+
+GameChannelTypes = Union[discord.TextChannel, discord.DMChannel]
+
+
+class MessageRenderer:
+    """
+    Keeps 1 message up to date, sending only what changed since the last edit.
+
+    Identical renders are skipped, and content or components are edited alone if only one of them changed.
+    Renders requested while editing are coalesced, and only the latest one is applied after the edit.
+
+    Renders may be cancelled when they are superseded. Cancelling stops an edit,
+    but a message being sent is always sent to the end and remembered, so it is never orphaned nor sent twice.
+    """
+
+    def __init__(self):
+        self.message: Optional[discord.Message] = None
+        self._content_hash: Optional[int] = None
+        self._components: Optional[List[Dict]] = None
+        self._components_hash: Optional[int] = None
+        self._components_hash_sent: Optional[int] = None
+        self._pending: Optional[Tuple[GameChannelTypes, str, discord.ui.View]] = None
+        self._sending: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    async def render(self, channel: GameChannelTypes, content: str, view: discord.ui.View) -> None:
+        self._pending = (channel, content, view)
+        async with self._lock:
+            # Applied by the render in progress unless it was cancelled, then by the first one waiting here.
+            while self._pending is not None:
+                channel, content, view = self._pending
+                self._pending = None
+                await self._apply(channel, content, view)
+
+    def _hash_components(self, view: discord.ui.View) -> int:
+        components = view.to_components()
+        if components is not self._components:  # Cached views return the same list while unchanged.
+            self._components = components
+            self._components_hash = hash(json.dumps(components, sort_keys=True))
+        return self._components_hash
+
+    async def _apply(self, channel: GameChannelTypes, content: str, view: discord.ui.View) -> None:
+        if self._sending is not None:
+            await asyncio.shield(self._sending)  # Sent by a cancelled render. Edit it instead of sending again.
+        content_hash = hash(content)
+        components_hash = self._hash_components(view)
+        if self.message is not None:
+            kwargs = {}
+            if content_hash != self._content_hash:
+                kwargs["content"] = content
+            if components_hash != self._components_hash_sent:
+                kwargs["view"] = view
+            if not kwargs:
+                return
+            try:
+                await self.message.edit(**kwargs)
+            except discord.errors.HTTPException:
+                self.message = None  # Deleted. Sent again below.
+            else:
+                self._content_hash = content_hash
+                self._components_hash_sent = components_hash
+                return
+        self._sending = asyncio.create_task(self._send(channel, content, view, content_hash, components_hash))
+        await asyncio.shield(self._sending)
+
+    async def _send(self, channel: GameChannelTypes, content: str, view: discord.ui.View,
+                    content_hash: int, components_hash: int) -> None:
+        try:
+            self.message = await channel.send(content, view=view)
+            self._content_hash = content_hash
+            self._components_hash_sent = components_hash
+        finally:
+            self._sending = None
+
+    def forget(self) -> None:
+        """Send as new message next time."""
+        self.message = None
+        self._content_hash = None
+        self._components_hash_sent = None
+
+
+def get_item_state(item: discord.ui.Item) -> Hashable:
+    """Everything of the item which game mutates. Other items are assumed to be never changed."""
+    if isinstance(item, discord.ui.Button):
+        return item.label, item.style, str(item.emoji), item.disabled
+    if isinstance(item, discord.ui.Select):
+        return item.placeholder, tuple((option.label, str(option.emoji), option.default) for option in item.options)
+    return id(item)
+
+
+class CachedComponentsMixin:
+    """
+    Serializes components of the view only when its items changed.
+
+    Views are shared by the players on the same side, and discord.py serializes the view on every edit.
+    Buttons are mutated in place by many handlers, so the cache is keyed by the state of the items themselves.
+    The same list is returned while unchanged, which MessageRenderer skips hashing.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._components_cache: Optional[Tuple[Hashable, List[Dict]]] = None
+
+    def add_item(self, item):
+        self._components_cache = None
+        return super().add_item(item)
+
+    def remove_item(self, item):
+        self._components_cache = None
+        return super().remove_item(item)
+
+    def to_components(self) -> List[Dict]:
+        state = tuple(get_item_state(item) for item in self.children)
+        if self._components_cache is None or self._components_cache[0] != state:
+            self._components_cache = (state, super().to_components())
+        return self._components_cache[1]
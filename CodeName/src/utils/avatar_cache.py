@@ -0,0 +1,71 @@
+import asyncio
+import logging
+import os
+from pathlib import Path
+from typing import Union
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+DiscordUserTypes = Union[discord.Member, discord.User]
+
+
+class AvatarCache:
+    """
+    Stores avatar images on disk, keyed by avatar hash.
+
+    The hash changes whenever the avatar changes, so cached files never go stale.
+    Avatars are fetched in the smallest CDN size which fits an emoji,
+    and concurrent requests for the same avatar share one download.
+    """
+    DEFAULT_CACHE_DIR = Path() / "avatar_cache"
+    EMOJI_SIZE = 128  # Discord shows custom emoji 128px at most. CDN size must be power of 2.
+    IMAGE_FORMAT = "png"
+
+    def __init__(self, cache_dir: Path = DEFAULT_CACHE_DIR, size: int = EMOJI_SIZE) -> None:
+        self.cache_dir: Path = cache_dir
+        self.size: int = size
+        self._downloading: dict[str, asyncio.Task] = {}
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def get_key(user: DiscordUserTypes) -> str:
+        """Hash of current avatar. Default avatars have keys too."""
+        return user.display_avatar.key
+
+    def get_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}_{self.size}.{self.IMAGE_FORMAT}"
+
+    async def read(self, user: DiscordUserTypes) -> bytes:
+        avatar: discord.Asset = user.display_avatar
+        path = self.get_path(avatar.key)
+        if path.exists():
+            return await asyncio.to_thread(path.read_bytes)
+
+        task = self._downloading.get(avatar.key)
+        if task is None:
+            task = asyncio.create_task(self._download(avatar, path))
+            self._downloading[avatar.key] = task
+            task.add_done_callback(lambda _: self._downloading.pop(avatar.key, None))
+        # Shielded so that one cancelled waiter doesn't cancel download for others.
+        return await asyncio.shield(task)
+
+    async def _download(self, avatar: discord.Asset, path: Path) -> bytes:
+        # Animated avatars are fetched as static image, since emoji is registered as static one.
+        bytes_ = await avatar.replace(size=self.size, format=self.IMAGE_FORMAT).read()
+        try:
+            await asyncio.to_thread(write_atomically, path, bytes_)
+        except OSError as e:
+            logger.warning(f"Failed to cache avatar {path.name}. {e}")
+        return bytes_
+
+    def __contains__(self, user: DiscordUserTypes) -> bool:
+        return self.get_path(self.get_key(user)).exists()
+
+
+def write_atomically(path: Path, bytes_: bytes) -> None:
+    """Half-written file is never left with the cached name even if the process dies."""
+    temp_path = path.with_suffix(path.suffix + ".tmp")
+    temp_path.write_bytes(bytes_)
+    os.replace(temp_path, path)
@@ -0,0 +1,79 @@
+import heapq
+import json
+import logging
+import time
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class AvatarEmojiRecord:
+    emoji_id: int
+    avatar_key: str  # Hash of the avatar which the emoji was made from.
+    last_used: float = 0.0  # Unix time.
+
+
+class AvatarEmojiMap:
+    """
+    Persistent map of (guild id, member id) to avatar emoji.
+
+    Keyed by ids instead of emoji names, so members whose names romanize to the same name never collide.
+    """
+    DEFAULT_PATH = Path() / "avatar_emojis.json"
+    NO_GUILD = 0  # For users out of guild, like in DM.
+
+    def __init__(self, path: Path = DEFAULT_PATH) -> None:
+        self.path: Path = path
+        self._records: dict[tuple[int, int], AvatarEmojiRecord] = {}
+        self._is_dirty = False
+        self.load()
+
+    def get(self, guild_id: Optional[int], member_id: int) -> Optional[AvatarEmojiRecord]:
+        return self._records.get((guild_id or self.NO_GUILD, member_id))
+
+    def set(self, guild_id: Optional[int], member_id: int, record: AvatarEmojiRecord) -> None:
+        self._records[(guild_id or self.NO_GUILD, member_id)] = record
+        self._is_dirty = True
+
+    def remove(self, guild_id: Optional[int], member_id: int) -> Optional[AvatarEmojiRecord]:
+        record = self._records.pop((guild_id or self.NO_GUILD, member_id), None)
+        if record is not None:
+            self._is_dirty = True
+        return record
+
+    def touch(self, guild_id: Optional[int], member_id: int) -> None:
+        record = self.get(guild_id, member_id)
+        if record is not None:
+            record.last_used = time.time()
+            self._is_dirty = True
+
+    def least_recently_used(self, count: int, predicate: Optional[Callable[[AvatarEmojiRecord], bool]] = None
+                            ) -> list[tuple[tuple[int, int], AvatarEmojiRecord]]:
+        """Return ((guild id, member id), record) of the oldest used emojis, filtered by predicate."""
+        items = self._records.items()
+        if predicate is not None:
+            items = (item for item in items if predicate(item[1]))
+        return heapq.nsmallest(count, items, key=lambda item: item[1].last_used)
+
+    def load(self) -> None:
+        if not self.path.exists():
+            return
+        with self.path.open(mode="r") as f:
+            for key, data in json.load(f).items():
+                guild_id, member_id = map(int, key.split(":"))
+                self._records[(guild_id, member_id)] = AvatarEmojiRecord(**data)
+
+    def save(self) -> None:
+        if not self._is_dirty:
+            return
+        for_json = {f"{guild_id}:{member_id}": asdict(record)
+                    for (guild_id, member_id), record in self._records.items()}
+        with self.path.open(mode="w") as f:
+            json.dump(for_json, f)
+        self._is_dirty = False
+
+    def __len__(self):
+        return len(self._records)
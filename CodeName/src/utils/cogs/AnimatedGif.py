@@ -1,28 +1,163 @@
-#
-# class AnimatedGif(Cog):  # not working yet
-#     def __init__(self, bot):
-#         super().__init__(bot)
-#         self.bot = bot
-#         self.gif_emojis = {}
-#
-#     @Cog.listener()
-#     async def on_ready(self):
-#         for emoji in self.bot.emojis:
-#             if emoji.animated:
-#                 self.gif_emojis[emoji.name] = emoji
-#
-#
-# class AnimatedGifTimer(EmojiTimer):
-#     PREFIX_OF_GIF = "count"
-#     DEFAULT_TIMING_OF_EDITING_GIF = (9, 5, 2)
-#
-#     def store_emoji(self, emoji):
-#         if emoji.animated and emoji.name.startswith(self.PREFIX_OF_GIF):
-#             self.gif_emojis[emoji.name] = str(emoji)
-#         else:
-#             super().store_emoji(emoji)
-#
-#     def convert_seconds_to_emojis(self, seconds):
-#         super_result = super().convert_seconds_to_emojis(seconds)
-#         splited = super_result.split(">")
-#         restored = map(lambda x: x+">", splited)
+"""
+Timer using animated emojis which count down the ones digit of seconds by themselves.
+
+The message is edited only at boundaries of segments (every 10 or 5 seconds),
+and discord client animates the rest.
+"""
+import asyncio
+import logging
+from io import BytesIO
+from pathlib import Path
+from typing import Iterable
+
+import discord
+from PIL import Image
+from discord.ext.commands import Cog, Context, command
+from emoji_manager.storage_pool import EmojiStoragePool
+from utils.cogs.emoji_timer import CustomEmojiTimerCog
+from utils.inner_timer import CountDownTimer
+
+logger = logging.getLogger(__name__)
+
+NUMBER_IMAGES_DIR = Path(__file__).parent / "number_images"
+PREFIX_OF_GIF = "count"
+FRAME_MILLISECONDS = 1000
+HOLD_MILLISECONDS = 10000  # Last frame is held long, so the gif doesn't loop visibly even if next edit is late.
+EMOJI_SIZE = (100, 100)
+
+
+def get_gif_emoji_name(start: int, end: int) -> str:
+    return f"{PREFIX_OF_GIF}{start}to{end}"
+
+
+def get_segment_end(ones_digit: int, segment_seconds: int) -> int:
+    """ex. ones_digit 7 is in segment 9->5 if segment_seconds is 5, so returns 5."""
+    return ones_digit - ones_digit % segment_seconds
+
+
+def iter_gif_ranges(segment_seconds: int) -> Iterable[tuple[int, int]]:
+    """
+    Every start digit is needed, not only the head of segments,
+    to resync when editing message was late.
+    """
+    for start in range(10):
+        yield start, get_segment_end(start, segment_seconds)
+
+
+def make_countdown_gif(start: int, end: int, images_dir: Path = NUMBER_IMAGES_DIR,
+                       size: tuple[int, int] = EMOJI_SIZE) -> bytes:
+    frames = []
+    for digit in range(start, end - 1, -1):
+        with Image.open(images_dir / "right_align" / f"{digit}_right.jpg") as image:
+            frames.append(image.convert("RGB").resize(size))
+    durations = [FRAME_MILLISECONDS] * (len(frames) - 1) + [HOLD_MILLISECONDS]
+    buffer = BytesIO()
+    frames[0].save(buffer, format="GIF", save_all=True, append_images=frames[1:], duration=durations, loop=0)
+    return buffer.getvalue()
+
+
+def generate_countdown_gifs(output_dir: Path, segment_seconds: int = 10,
+                            images_dir: Path = NUMBER_IMAGES_DIR) -> list[Path]:
+    output_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for start, end in iter_gif_ranges(segment_seconds):
+        path = output_dir / f"{get_gif_emoji_name(start, end)}.gif"
+        path.write_bytes(make_countdown_gif(start, end, images_dir))
+        paths.append(path)
+    return paths
+
+
+class AnimatedGifTimer(CustomEmojiTimerCog):
+    """
+    Shows the ones digit of seconds with animated emoji, and edits message once per segment.
+
+    Each edit picks the gif starting from the actual remaining seconds,
+    so displayed frames are realigned to the real deadline on every edit even after lag.
+    """
+    SEGMENT_SECONDS = 10  # 10 or 5
+    MAX_DRIFT = 0.25  # If current digit is shown less than this seconds, wait next digit to start the gif.
+    DEFAULT_OUTPUT_DIR = Path() / "countdown_gifs"
+
+    def __init__(self, bot,
+                 id_of_emoji_storage_guild: int,
+                 segment_seconds: int = SEGMENT_SECONDS,
+                 ids_of_other_storage_guilds: Iterable[int] = ()) -> None:
+        if 10 % segment_seconds:
+            raise ValueError(f"Segment seconds must be a divisor of 10, but {segment_seconds} was given.")
+        super().__init__(bot, id_of_emoji_storage_guild, render_mode=self.RENDER_DIGITS,
+                         ids_of_other_storage_guilds=ids_of_other_storage_guilds)
+        self.segment_seconds = segment_seconds
+        self.storage = EmojiStoragePool(bot, [id_of_emoji_storage_guild, *ids_of_other_storage_guilds])
+
+    async def loop_count(self, message, timer: CountDownTimer):
+        """
+        Edit message only at boundaries of segments.
+
+        Raises
+        ------
+        CountDownTimer.Stopped
+        """
+        while timer.remaining_seconds > 0:
+            remaining = timer.remaining_seconds
+            fractional = remaining - int(remaining)
+            if fractional < self.MAX_DRIFT and int(remaining) > 0:
+                await asyncio.sleep(fractional)  # Current digit is almost over. Start gif with next digit.
+                remaining = timer.remaining_seconds
+            seconds = int(remaining)
+            message = await self.update_timer_message(seconds, message)
+
+            ones_digit = seconds % 10
+            shown_till = seconds - (ones_digit - get_segment_end(ones_digit, self.segment_seconds))
+            drift = remaining - timer.remaining_seconds  # Time spent to edit.
+            if drift > 2:
+                channel = message.channel
+                logger.warning(f"So laggy. Editing message took {drift} seconds "
+                               f"in channel: {channel.name} guild: {channel.guild.name} {channel.id}.")
+            wait_time = max(timer.remaining_seconds - shown_till, self.min_interval)
+            await asyncio.sleep(wait_time)
+            if timer.is_stopped:
+                raise timer.Stopped()
+        else:
+            await self.update_timer_message(0, message)
+
+    def _seconds_to_emojis(self, seconds) -> list[str]:
+        emojis = super()._seconds_to_emojis(seconds)
+        ones_digit = seconds % 10
+        if seconds >= self.segment_seconds or ones_digit:
+            gif = self.get_emoji(emoji_name=get_gif_emoji_name(
+                ones_digit, get_segment_end(ones_digit, self.segment_seconds)))
+            if gif:  # Falls back to static digit if gifs are not registered.
+                emojis[-1] = str(gif)
+        return emojis
+
+    @command()
+    async def provision_countdown_gifs(self, ctx: Context) -> None:
+        """Register animated emojis for this timer. Already registered ones are skipped."""
+        loop = asyncio.get_running_loop()
+        # Encoding gifs by Pillow takes a while, so it must not block the event loop.
+        paths = await loop.run_in_executor(None, generate_countdown_gifs,
+                                           self.DEFAULT_OUTPUT_DIR, self.segment_seconds)
+        paths = [path for path in paths if path.stem not in self.storage]
+        try:
+            placement = self.storage.plan(paths)
+        except self.storage.NotEnoughCapacity as e:
+            await ctx.send(f"Storage servers have no capacity for animated emojis. {e}")
+            return
+        failed = []
+        for guild, images in placement.items():
+            for image in images:
+                try:
+                    await self.storage.create_custom_emoji(name=image.stem, image=image.read_bytes(),
+                                                           animated=True, guild=guild)
+                except discord.errors.HTTPException as e:
+                    logger.warning(f"Failed to register {image.stem} in {guild.name}. {e}")
+                    failed.append(image.stem)
+        content = f"Registered {len(paths) - len(failed)} animated emojis."
+        if failed:
+            content += "\nFailed to register followings. Try once later.:\n" + "\n".join(failed)
+        await ctx.send(content)
+
+    @Cog.listener()
+    async def on_guild_emojis_update(self, guild: discord.Guild, before, after) -> None:
+        await super().on_guild_emojis_update(guild, before, after)
+        self.storage.on_guild_emojis_update(guild, before, after)
@@ -1,21 +1,36 @@
+import asyncio
 import logging
-from typing import Optional
+import time
+from typing import Iterable, Optional
 
 import discord
-import pykakasi
 from discord.ext.commands import Cog, command
+from emoji_manager.storage_pool import EmojiStoragePool
+from utils.avatar_cache import AvatarCache
+from utils.avatar_emoji_map import AvatarEmojiMap, AvatarEmojiRecord
+from utils.romanizer import Romanizer, romanize_in_pool
 
 logger = logging.getLogger(__name__)
-kks = pykakasi.kakasi()
 
 
 class AvatarEmojiRegister(Cog):
-    DEFAULT_GUILD_ID = 853249947952087050  # 実験鯖
-    kks_converter = kks
+    STORAGE_GUILD_IDS = (853249947952087050,  # 実験鯖
+                         564350361444286464)
+    LOW_WATERMARK = 5  # Evicts in background when free static slots in storage get fewer than this.
+    EVICTION_BATCH = 10
+    POOL_THRESHOLD = 50  # Fewer names are romanized lazily, cheaper than starting processes loading pykakasi.
 
-    def __init__(self, bot: discord.ext.commands.Bot) -> None:
+    def __init__(self, bot: discord.ext.commands.Bot, storage_guild_ids: Optional[Iterable[int]] = None,
+                 romanizer: Optional[Romanizer] = None, avatar_cache: Optional[AvatarCache] = None,
+                 emoji_map: Optional[AvatarEmojiMap] = None) -> None:
         self.bot: discord.ext.commands.Bot = bot
-        self._guild: discord.Guild = bot.get_guild(self.DEFAULT_GUILD_ID)
+        self.storage: EmojiStoragePool = EmojiStoragePool(bot, storage_guild_ids or self.STORAGE_GUILD_IDS)
+        self.romanizer: Romanizer = romanizer or Romanizer()
+        self.avatar_cache: AvatarCache = avatar_cache or AvatarCache()
+        self.emoji_map: AvatarEmojiMap = emoji_map or AvatarEmojiMap()
+        self._eviction_lock = asyncio.Lock()
+        self._eviction_task: Optional[asyncio.Task] = None
+        self._warm_up_lock = asyncio.Lock()  # Guilds get available at once on startup. 1 process pool at a time.
 
     @command()
     async def register(self, ctx: discord.ext.commands.Context = None,
@@ -25,20 +40,83 @@ class AvatarEmojiRegister(Cog):
                            "since I don't know which guild you want to register.")
             return None
         member: discord.Member = member or ctx.author
-        obj_for_guild = ctx or member or self
-        guild = guild or obj_for_guild.guild
-        avatar = member.avatar
-        bytes_ = await avatar.read()
+        guild = guild or (ctx and ctx.guild)  # If None, storage pool picks a guild with free slot.
+        emoji = await self._create_emoji(member, guild, **kwargs)
+        if emoji is not None:
+            record = AvatarEmojiRecord(emoji_id=emoji.id, avatar_key=self.avatar_cache.get_key(member),
+                                       last_used=time.time())
+            self.emoji_map.set(get_guild_id(member), member.id, record)
+            self.emoji_map.save()
+            self._evict_in_background_if_needed()
+        return emoji
+
+    async def _create_emoji(self, member: discord.Member, guild: Optional[discord.Guild],
+                            **kwargs) -> Optional[discord.Emoji]:
+        bytes_ = await self.avatar_cache.read(member)
         name_for_emoji: str = self.get_ascii_name(member)
-        try:
-            return await guild.create_custom_emoji(name=name_for_emoji, image=bytes_, **kwargs)
-        except discord.errors.HTTPException as e:
-            if e.code == 30008:  # Reaches the limit count of emoji.
-                logger.info(e.text)
-            elif e.code == 50035:  # 'Invalid Form Body In name: String value did not match validation regex.'
-                logger.info(f"{name_for_emoji} was not valid name to register as emoji.")
-                emoji_name = str(member.id)
-                return await guild.create_custom_emoji(name=emoji_name, image=bytes_, **kwargs)
+        for _ in range(3):
+            try:
+                return await self.storage.create_custom_emoji(name=name_for_emoji, image=bytes_, guild=guild, **kwargs)
+            except self.storage.NotEnoughCapacity as e:
+                logger.info(e)
+            except discord.errors.HTTPException as e:
+                if e.code == 30008:  # Reaches the limit count of emoji.
+                    logger.info(e.text)
+                elif e.code == 50035:  # 'Invalid Form Body In name: String value did not match validation regex.'
+                    logger.info(f"{name_for_emoji} was not valid name to register as emoji.")
+                    name_for_emoji = str(member.id)
+                    continue
+                else:
+                    logger.warning(e)
+                    return None
+            if guild is not None and guild.id not in self.storage.guild_ids:
+                return None  # Evicting avatars in storage doesn't make room in other guilds.
+            freed_guilds = await self.evict(self.EVICTION_BATCH)
+            if not freed_guilds:
+                return None
+            # Cache of guild.emojis is updated later by gateway event, so specify the guild surely freed.
+            guild = freed_guilds[0]
+        return None
+
+    def touch(self, member: discord.Member) -> None:
+        """Mark avatar emoji of the member as used now, so that it is evicted later."""
+        self.emoji_map.touch(get_guild_id(member), member.id)
+
+    async def evict(self, count: int) -> list[discord.Guild]:
+        """
+        Delete least recently used avatar emojis in storage guilds.
+
+        Returns
+        -------
+        list[discord.Guild]
+            Guilds where slots were freed.
+        """
+        def is_in_storage(record: AvatarEmojiRecord) -> bool:
+            emoji = self.bot.get_emoji(record.emoji_id)
+            return emoji is None or emoji.guild_id in self.storage.guild_ids
+
+        async with self._eviction_lock:
+            freed_guilds = []
+            for (guild_id, member_id), record in self.emoji_map.least_recently_used(count, is_in_storage):
+                emoji = self.bot.get_emoji(record.emoji_id)
+                if emoji is not None:
+                    try:
+                        await self.storage.delete_emoji(emoji, reason="Least recently used avatar emoji.")
+                    except discord.errors.HTTPException as e:
+                        logger.warning(e)
+                        continue
+                    freed_guilds.append(emoji.guild)
+                self.emoji_map.remove(guild_id, member_id)
+            self.emoji_map.save()
+        logger.info(f"Evicted {len(freed_guilds)} avatar emojis.")
+        return freed_guilds
+
+    def _evict_in_background_if_needed(self) -> None:
+        """Make room ahead of time, so that registration doesn't wait for deletions in the middle of game."""
+        if self._eviction_task is not None and not self._eviction_task.done():
+            return
+        if self.storage.guilds and self.storage.capacity() < self.LOW_WATERMARK:
+            self._eviction_task = asyncio.create_task(self.evict(self.EVICTION_BATCH))
 
     def get_ascii_name(self, member: discord.Member) -> str:
         for name in [member.nick, member.name]:
@@ -48,7 +126,7 @@ class AvatarEmojiRegister(Cog):
             if name.encode("utf-8").isalnum():
                 return name
             else:
-                name = "".join([item["hepburn"] or item["orig"] for item in self.kks_converter.convert(name)])
+                name = self.romanizer.romanize(name)
                 if name.encode("utf-8").isalnum():
                     return name
                 else:
@@ -59,11 +137,39 @@ class AvatarEmojiRegister(Cog):
     def load_emoji(self):
         pass
 
+    async def warm_up(self, guild: discord.Guild) -> None:
+        """Romanize names of members in process pool if many are unknown, so that later lookups hit the cache."""
+        names = {name for member in guild.members for name in [member.nick, member.name]
+                 if name and not name.encode("utf-8").isalnum()}
+        unknown = self.romanizer.get_unknown(names)
+        if len(unknown) < self.POOL_THRESHOLD:
+            return  # Left to Romanizer.romanize on registration.
+        loop = asyncio.get_running_loop()
+        romanized = await loop.run_in_executor(None, romanize_in_pool, unknown)
+        self.romanizer.update(romanized)
+        self.romanizer.save()
+        logger.info(f"Romanized {len(romanized)} names in {guild.name}.")
+
+    def cog_unload(self) -> None:
+        self.romanizer.save()
+        self.emoji_map.save()
+
     async def get_avatar_emoji(self, member: discord.Member, **kwargs) -> Optional[discord.Emoji]:
-        name = self.get_ascii_name(member)
-        for emoji in member.guild.emojis:
-            if emoji.name == name:
+        """Return registered avatar emoji of the member. Registers it again if the avatar was changed."""
+        guild_id = get_guild_id(member)
+        record = self.emoji_map.get(guild_id, member.id)
+        if record is not None:
+            emoji = self.bot.get_emoji(record.emoji_id)
+            if emoji is not None and record.avatar_key == self.avatar_cache.get_key(member):
+                self.emoji_map.touch(guild_id, member.id)
                 return emoji
+            if emoji is not None:  # The avatar was changed, so the emoji is outdated.
+                try:
+                    await self.storage.delete_emoji(emoji)
+                except discord.errors.HTTPException as e:
+                    logger.warning(e)
+            self.emoji_map.remove(guild_id, member.id)
+            self.emoji_map.save()
 
         try:
             emoji = await self.register(member=member, **kwargs)
@@ -73,17 +179,22 @@ class AvatarEmojiRegister(Cog):
         else:
             return emoji
 
+    @Cog.listener()
+    async def on_guild_emojis_update(self, guild: discord.Guild, before, after) -> None:
+        self.storage.on_guild_emojis_update(guild, before, after)
+
+    @Cog.listener()
+    async def on_guild_available(self, guild: discord.Guild) -> None:
+        """Called on startup and reconnect, before members start games."""
+        async with self._warm_up_lock:
+            await self.warm_up(guild)
+
     @property
     def guild(self) -> discord.Guild:
-        limits = self._guild.emoji_limit
-        emoji_count = len(self._guild.emojis)
-        if limits <= emoji_count:
-            self.guild = self.get_another_guild()
-        return self._guild
-
-    @guild.setter
-    def guild(self, value: discord.Guild) -> None:
-        self._guild = value
-
-    def get_another_guild(self) -> discord.Guild:
-        return self.bot.get_guild(564350361444286464)
+        """Storage guild which has room for a static emoji now."""
+        return self.storage.pick_guild()
+
+
+def get_guild_id(member: discord.Member) -> Optional[int]:
+    guild = getattr(member, "guild", None)  # discord.User doesn't have guild.
+    return guild and guild.id
@@ -1,4 +1,3 @@
-from functools import lru_cache
 from typing import Optional
 
 import discord
@@ -6,18 +5,60 @@ from discord.ext.commands import command, Cog
 
 
 class EmojiLoader(Cog):
-    def __init__(self, bot, id_of_guild: int):
+    def __init__(self, bot, id_of_guild: int, *ids_of_other_guilds: int):
+        """
+        Parameters
+        ----------
+        id_of_guild : int
+            Id of guild storing emojis.
+        ids_of_other_guilds : int
+            Ids of additional storage guilds, for emojis beyond the limit of one guild.
+        """
         super().__init__()
         self.bot = bot
         self.__id_of_emoji_storage_guild = id_of_guild
+        self.__ids_of_storage_guilds = {id_of_guild, *ids_of_other_guilds}
+        self._emoji_strings: Optional[dict[str, str]] = None  # emoji name -> str(emoji)
 
     @property
-    @lru_cache()
-    def guild_storing_emoji(self):
+    def guild_storing_emoji(self) -> Optional[discord.Guild]:
         return self.bot.get_guild(self.__id_of_emoji_storage_guild)
 
-    def get_emoji(self, emoji_name):
-        return discord.utils.get(self.bot.emojis, name=emoji_name, guild=self.guild_storing_emoji)
+    def get_emoji(self, emoji_name) -> Optional[str]:
+        """Return emoji as str, which can be put into message content as is."""
+        index = self._get_index()
+        if index is None:
+            return None
+        return index.get(emoji_name)
+
+    def _get_index(self) -> Optional[dict[str, str]]:
+        """Build index lazily, since storage guilds are not cached before the bot gets ready."""
+        if self._emoji_strings is None:
+            if self.guild_storing_emoji is None:
+                return None
+            self._emoji_strings = {}
+            for guild_id in self.__ids_of_storage_guilds:
+                guild = self.bot.get_guild(guild_id)
+                if guild is None:
+                    continue
+                for emoji in guild.emojis:
+                    self._emoji_strings.setdefault(emoji.name, str(emoji))
+        return self._emoji_strings
+
+    @Cog.listener()
+    async def on_guild_emojis_update(self, guild: discord.Guild, before, after) -> None:
+        if guild.id in self.__ids_of_storage_guilds:
+            self._emoji_strings = None  # guild.emojis is already updated, so it is rebuilt on next lookup.
+
+    @Cog.listener()
+    async def on_guild_available(self, guild: discord.Guild) -> None:
+        if guild.id in self.__ids_of_storage_guilds:
+            self._emoji_strings = None
+
+    @Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild) -> None:
+        if guild.id in self.__ids_of_storage_guilds:
+            self._emoji_strings = None
 
 
 class EmojiRegister(Cog):
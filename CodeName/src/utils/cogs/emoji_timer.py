@@ -1,18 +1,19 @@
 import asyncio
 import logging
 from math import modf
-from typing import Optional, Dict
+from typing import Optional, Dict, Iterable
 
 import discord
 from discord.ext.commands import command
 from utils import messaging
-from utils.emoji_loader import EmojiLoaderCog
+from utils.cogs.emoji_register import EmojiLoader
+from utils.cogs.pair_emojis import PAIR_RANGE, get_pair_emoji_name
 from utils.inner_timer import CountDownTimer
 
 logger = logging.getLogger(__name__)
 
 
-class CustomEmojiTimerCog(EmojiLoaderCog):
+class CustomEmojiTimerCog(EmojiLoader):
     SUFFIX_OF_LEFT_ALIGN = "_with_colon"
     SUFFIX_OF_RIGHT_ALIGN = "_right_align"
     SUFFIX_OF_RIGHTMOST = "_rightmost"
@@ -26,14 +27,20 @@ class CustomEmojiTimerCog(EmojiLoaderCog):
     DEFAULT_MINUTES = 60
     DEFAULT_TIMER_ICON_NAME = "hourglass"
 
+    RENDER_DIGITS = "digits"  # 1 emoji per digit
+    RENDER_PAIRS = "pairs"  # 1 emoji per 2 digits. Requires emojis registered by PairEmojiProvisioner.
+
     def __init__(self, bot,
                  id_of_emoji_storage_guild: int,
-                 minimum_interval_to_edit: float = 0.3) -> None:
-        EmojiLoaderCog.__init__(self, bot, id_of_emoji_storage_guild)
+                 minimum_interval_to_edit: float = 0.3,
+                 render_mode: str = RENDER_DIGITS,
+                 ids_of_other_storage_guilds: Iterable[int] = ()) -> None:
+        EmojiLoader.__init__(self, bot, id_of_emoji_storage_guild, *ids_of_other_storage_guilds)
 
         self._timer_dict: Dict[int: CountDownTimer] = {}
         self._message_dict: Dict[int: discord.Message] = {}
         self.min_interval = minimum_interval_to_edit
+        self.render_mode = render_mode
 
     def get_timer(self, textchannel_id: int) -> CountDownTimer:
         return self._timer_dict.get(textchannel_id)
@@ -109,6 +116,10 @@ class CustomEmojiTimerCog(EmojiLoaderCog):
         return self.get_emoji(emoji_name=self.DEFAULT_TIMER_ICON_NAME)
 
     def _seconds_to_emojis(self, seconds) -> list[str]:
+        if self.render_mode == self.RENDER_PAIRS:
+            pair_emojis = self._seconds_to_pair_emojis(seconds)
+            if pair_emojis:
+                return pair_emojis
         minutes, seconds = divmod(seconds, 60)
         time_str = "{:0>2}{:0>2}".format(minutes, seconds)
         emojis = []
@@ -116,6 +127,17 @@ class CustomEmojiTimerCog(EmojiLoaderCog):
             emojis.append(str(self._get_num_emoji(num_str, digit_place=i)))
         return emojis[-1::-1]
 
+    def _seconds_to_pair_emojis(self, seconds) -> Optional[list[str]]:
+        """Returns None if the time cannot be shown by pairs, then digit emojis should be used instead."""
+        minutes, seconds = divmod(seconds, 60)
+        if minutes not in PAIR_RANGE:
+            return None
+        left = self.get_emoji(emoji_name=get_pair_emoji_name(minutes, is_left=True))
+        right = self.get_emoji(emoji_name=get_pair_emoji_name(seconds, is_left=False))
+        if left is None or right is None:  # Not registered yet.
+            return None
+        return [str(left), str(right)]
+
     def _get_num_emoji(self, num_str: str, digit_place: int):
         """
         Parameters
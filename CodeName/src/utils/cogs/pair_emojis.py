@@ -0,0 +1,153 @@
+"""
+Emojis showing 2 digits at once, 00 to 59, so that a timer needs only 2 emojis for MM:SS instead of 4.
+
+Left pair shows minutes with colon like "05:", right pair shows seconds like "37".
+"""
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from pathlib import Path
+from typing import Iterable, Optional
+
+import discord
+from PIL import Image, ImageDraw, ImageFont
+from discord.ext.commands import Cog, Context, command
+from emoji_manager.storage_pool import EmojiStoragePool
+
+logger = logging.getLogger(__name__)
+
+NUMBER_IMAGES_DIR = Path(__file__).parent / "number_images"
+PAIR_RANGE = range(60)
+SUFFIX_OF_LEFT_PAIR = "_pair_with_colon"
+SUFFIX_OF_RIGHT_PAIR = "_pair_right"
+EMOJI_SIZE = (128, 128)
+
+
+def get_pair_emoji_name(num: int, is_left: bool) -> str:
+    suffix = SUFFIX_OF_LEFT_PAIR if is_left else SUFFIX_OF_RIGHT_PAIR
+    return "{:0>2}{}".format(num, suffix)
+
+
+def render_pair(left_image: Path, right_image: Path, size: tuple[int, int] = EMOJI_SIZE) -> bytes:
+    """Put 2 digit images side by side, and shrink them into 1 emoji."""
+    with Image.open(left_image) as left, Image.open(right_image) as right:
+        canvas = Image.new("RGB", (left.width + right.width, max(left.height, right.height)), "white")
+        canvas.paste(left, (0, 0))
+        canvas.paste(right, (left.width, 0))
+    return _to_png(canvas.resize(size))
+
+
+def render_pair_with_font(text: str, font_path: str, size: tuple[int, int] = EMOJI_SIZE) -> bytes:
+    canvas = Image.new("RGBA", size, (0, 0, 0, 0))
+    draw = ImageDraw.Draw(canvas)
+    font = ImageFont.truetype(font_path, size=size[1])
+    left, top, right, bottom = draw.textbbox((0, 0), text, font=font)
+    text_image = Image.new("RGBA", (right - left, bottom - top), (0, 0, 0, 0))
+    ImageDraw.Draw(text_image).text((-left, -top), text, font=font, fill="black")
+    return _to_png(text_image.resize(size))
+
+
+def _to_png(image: Image.Image) -> bytes:
+    buffer = BytesIO()
+    image.save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue()
+
+
+def _render_job(job: tuple) -> tuple[str, bytes]:
+    """Runs in worker process. Must be module level to be pickled."""
+    name, kind, *args = job
+    if kind == "font":
+        return name, render_pair_with_font(*args)
+    return name, render_pair(*args)
+
+
+def make_jobs(images_dir: Path = NUMBER_IMAGES_DIR, font_path: Optional[str] = None) -> list[tuple]:
+    jobs = []
+    for num in PAIR_RANGE:
+        tens, ones = divmod(num, 10)
+        left_name, right_name = get_pair_emoji_name(num, True), get_pair_emoji_name(num, False)
+        if font_path:
+            jobs.append((left_name, "font", "{:0>2}:".format(num), font_path))
+            jobs.append((right_name, "font", "{:0>2}".format(num), font_path))
+        else:
+            jobs.append((left_name, "digits",
+                         images_dir / "center_align" / f"{tens}.jpg",
+                         images_dir / "left_align_with_colon" / f"{ones}_with_colon.jpg"))
+            jobs.append((right_name, "digits",
+                         images_dir / "right_align" / f"{tens}_right.jpg",
+                         images_dir / "right_align" / f"{ones}_right.jpg"))
+    return jobs
+
+
+def generate_pair_images(output_dir: Path, images_dir: Path = NUMBER_IMAGES_DIR,
+                         font_path: Optional[str] = None, max_workers: Optional[int] = None) -> list[Path]:
+    """
+    Render all pair emojis in process pool, and save them as png files named same as emoji.
+
+    Parameters
+    ----------
+    images_dir : Path
+        Dir including center_align, left_align_with_colon and right_align digit images.
+    font_path : Optional[str]
+        If given, pairs are drawn with the font instead of digit images.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for name, png in executor.map(_render_job, make_jobs(images_dir, font_path)):
+            path = output_dir / f"{name}.png"
+            path.write_bytes(png)
+            paths.append(path)
+    return paths
+
+
+class PairEmojiProvisioner(Cog):
+    """Generates pair emojis and uploads them across storage guilds."""
+    DEFAULT_OUTPUT_DIR = Path() / "pair_images"
+
+    def __init__(self, bot: discord.ext.commands.Bot, storage_guild_ids: Iterable[int]) -> None:
+        self.bot: discord.ext.commands.Bot = bot
+        self.storage: EmojiStoragePool = EmojiStoragePool(bot, storage_guild_ids)
+
+    @command()
+    async def provision_pair_emojis(self, ctx: Context, font_path: Optional[str] = None) -> None:
+        """Register 00-59 pair emojis for timer. Already registered ones are skipped."""
+        message = await ctx.send("Generating pair emojis... Wait for a while.")
+        paths = await asyncio.get_running_loop().run_in_executor(
+            None, generate_pair_images, self.DEFAULT_OUTPUT_DIR, NUMBER_IMAGES_DIR, font_path)
+        paths = [path for path in paths if path.stem not in self.storage]
+        try:
+            placement = self.storage.plan(paths)
+        except self.storage.NotEnoughCapacity as e:
+            await message.edit(content=f"Storage servers have no capacity for pair emojis. {e}")
+            return
+
+        await message.edit(content=f"Registering {len(paths)} pair emojis...")
+        failed = []
+        for guild, images in placement.items():
+            for image in images:
+                try:
+                    await self.storage.create_custom_emoji(name=image.stem, image=image.read_bytes(), guild=guild)
+                except discord.HTTPException as e:
+                    logger.warning(f"Failed to register {image.stem}. {e}")
+                    failed.append(image.stem)
+        content = f"Registered {len(paths) - len(failed)} pair emojis."
+        if failed:
+            content += f"\nFailed: {', '.join(failed)}"
+        await message.edit(content=content)
+
+    @Cog.listener()
+    async def on_guild_emojis_update(self, guild: discord.Guild, before, after) -> None:
+        self.storage.on_guild_emojis_update(guild, before, after)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate pair emoji images for timer.")
+    parser.add_argument("output_dir", type=Path)
+    parser.add_argument("--font", default=None, help="Path of font file. Digit images are used if omitted.")
+    args = parser.parse_args()
+    for generated in generate_pair_images(args.output_dir, font_path=args.font):
+        print(generated)
@@ -0,0 +1,122 @@
+import json
+import logging
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+_converter_in_worker = None
+
+
+def load_converter():
+    """Loading dictionary of pykakasi takes a while, so import and construct it only when needed."""
+    import pykakasi
+    return pykakasi.kakasi()
+
+
+def convert(converter, name: str) -> str:
+    return "".join([item["hepburn"] or item["orig"] for item in converter.convert(name)])
+
+
+def _init_worker() -> None:
+    global _converter_in_worker
+    _converter_in_worker = load_converter()
+
+
+def _convert_in_worker(name: str) -> str:
+    return convert(_converter_in_worker, name)
+
+
+def romanize_in_pool(names: Iterable[str], max_workers: Optional[int] = None) -> dict[str, str]:
+    """Romanize many names in process pool. Each worker loads its own converter once."""
+    names = list(dict.fromkeys(names))
+    if not names:
+        return {}
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker) as executor:
+        chunksize = max(1, len(names) // 32)
+        return dict(zip(names, executor.map(_convert_in_worker, names, chunksize=chunksize)))
+
+
+class Romanizer:
+    """
+    Memoizes romanized names in bounded LRU, which is persisted as json between runs.
+
+    Examples
+    --------
+    romanizer = Romanizer()
+    romanizer.romanize("とんかつ")  # -> "tonkatsu"
+    romanizer.save()
+    """
+    DEFAULT_CACHE_PATH = Path() / "romanized_names.json"
+    DEFAULT_MAX_SIZE = 4096
+
+    def __init__(self, cache_path: Optional[Path] = DEFAULT_CACHE_PATH, max_size: int = DEFAULT_MAX_SIZE):
+        """
+        Parameters
+        ----------
+        cache_path : Optional[Path]
+            If None, the cache is not persisted.
+        max_size : int
+            Least recently used name is dropped when cache exceeds this.
+        """
+        self.cache_path: Optional[Path] = cache_path
+        self.max_size: int = max_size
+        self._cache: OrderedDict[str, str] = OrderedDict()
+        self._converter = None
+        self._is_dirty = False
+        self.load()
+
+    @property
+    def converter(self):
+        if self._converter is None:
+            self._converter = load_converter()
+        return self._converter
+
+    def romanize(self, name: str) -> str:
+        try:
+            romanized = self._cache[name]
+        except KeyError:
+            romanized = convert(self.converter, name)
+            self._store(name, romanized)
+        else:
+            self._cache.move_to_end(name)
+        return romanized
+
+    def get_unknown(self, names: Iterable[str]) -> list[str]:
+        return [name for name in names if name not in self._cache]
+
+    def update(self, romanized_names: dict[str, str]) -> None:
+        """Store results of romanize_in_pool."""
+        for name, romanized in romanized_names.items():
+            self._store(name, romanized)
+
+    def _store(self, name: str, romanized: str) -> None:
+        self._cache[name] = romanized
+        self._cache.move_to_end(name)
+        while len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+        self._is_dirty = True
+
+    def load(self) -> None:
+        if self.cache_path is None or not self.cache_path.exists():
+            return
+        try:
+            with self.cache_path.open(mode="r", encoding="utf-8") as f:
+                self._cache = OrderedDict(json.load(f))
+        except (json.JSONDecodeError, TypeError, ValueError) as e:
+            logger.warning(f"Failed to load cache of romanized names. {e}")
+            return
+        while len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+
+    def save(self) -> None:
+        if self.cache_path is None or not self._is_dirty:
+            return
+        with self.cache_path.open(mode="w", encoding="utf-8") as f:
+            json.dump(list(self._cache.items()), f, ensure_ascii=False)
+        self._is_dirty = False
+
+    def __len__(self):
+        return len(self._cache)
@@ -0,0 +1,83 @@
+from unittest import TestCase
+
+from board import Board
+
+
+class FakeTeam:
+    pass
+
+
+class FakeView:
+    def get_button(self, x, y):
+        return self, x, y
+
+
+class TestBoard(TestCase):
+    def setUp(self):
+        self.board = Board(row_count=5, column_count=5)
+        self.team = FakeTeam()
+        self.keys = [Board.get_key(self.team, side) for side in (0, 1)]
+        for key in self.keys:
+            self.board.assign_roles(key, over_count=3, hit_count=8)
+
+    def get_indexes(self, key, role):
+        return [index for index in range(self.board.size) if self.board.get_role(key, index) == role]
+
+    def test_roles_are_assigned_per_key(self):
+        for key in self.keys:
+            roles = self.board.roles[key]
+            self.assertEqual(len(roles), 25)
+            self.assertEqual(roles.count(Board.HIT), 8)
+            self.assertEqual(roles.count(Board.OVER), 3)
+        self.assertEqual(self.board.count_remaining_hits(self.team), 16)
+
+    def test_solving_hit_decrements_counter(self):
+        key = self.keys[0]
+        hit = self.get_indexes(key, Board.HIT)[0]
+        self.board.set_flag(key, hit, Board.SOLVED)
+        self.assertTrue(self.board.has_flag(key, hit, Board.SOLVED))
+        self.assertEqual(self.board.count_remaining_hits(self.team), 15)
+
+    def test_solving_twice_counts_once(self):
+        key = self.keys[0]
+        hit = self.get_indexes(key, Board.HIT)[0]
+        self.board.set_flag(key, hit, Board.SOLVED)
+        self.board.set_flag(key, hit, Board.SOLVED)
+        self.assertEqual(self.board.count_remaining_hits(self.team), 15)
+
+    def test_unsolving_hit_increments_counter(self):
+        key = self.keys[1]
+        hit = self.get_indexes(key, Board.HIT)[0]
+        self.board.set_flag(key, hit, Board.SOLVED)
+        self.board.set_flag(key, hit, Board.SOLVED, value=False)
+        self.assertEqual(self.board.count_remaining_hits(self.team), 16)
+
+    def test_other_flags_and_roles_keep_counter(self):
+        key = self.keys[0]
+        hit = self.get_indexes(key, Board.HIT)[0]
+        neutral = self.get_indexes(key, Board.NEUTRAL)[0]
+        self.board.set_flag(key, hit, Board.FAILED_NEUTRAL)
+        self.board.set_flag(key, neutral, Board.SOLVED)
+        self.assertTrue(self.board.has_flag(key, hit, Board.FAILED_NEUTRAL))
+        self.assertFalse(self.board.has_flag(key, hit, Board.SOLVED))
+        self.assertEqual(self.board.count_remaining_hits(self.team), 16)
+
+    def test_other_team_is_counted_separately(self):
+        other = FakeTeam()
+        self.board.assign_roles(Board.get_key(other, 0), over_count=3, hit_count=8)
+        self.assertEqual(self.board.count_remaining_hits(other), 8)
+        self.assertEqual(self.board.count_remaining_hits(self.team), 16)
+
+    def test_opposite_key(self):
+        self.assertEqual(Board.get_opposite_key(self.keys[0]), self.keys[1])
+        self.assertEqual(Board.get_opposite_key(self.keys[1]), self.keys[0])
+        self.assertIsNone(Board.get_opposite_key(Board.get_key(None, 0)))
+
+    def test_opposite_button(self):
+        for key in self.keys + [None]:
+            self.board.views[key] = FakeView()
+        self.assertEqual(self.board.get_opposite_button(self.keys[0], 1, 2), (self.board.views[self.keys[1]], 1, 2))
+        self.assertIsNone(self.board.get_opposite_button(None, 1, 2))  # Not the button of spectators itself.
+
+    def test_index(self):
+        self.assertEqual(self.board.get_index(x=2, y=3), 17)
@@ -0,0 +1,78 @@
+import asyncio
+from unittest import IsolatedAsyncioTestCase
+
+from event_queue import EventQueue
+
+BATCH_SECONDS = 0.05
+
+
+class FakeGame:
+    """Requests updates as GameBase does, merged into the batch being handled."""
+
+    def __init__(self):
+        self.events = EventQueue(self.update, BATCH_SECONDS)
+        self.clicked = []
+        self.rounds = []
+        self.is_over = False
+
+    async def update(self, for_keywords=True, for_action=True, prioritized_player=None):
+        if self.events.merge(for_keywords=for_keywords, for_action=for_action, prioritized_player=prioritized_player):
+            return
+        self.rounds.append((list(self.clicked), for_keywords, for_action, prioritized_player))
+
+    async def click(self, player: str, for_action: bool = False):
+        self.clicked.append(player)
+        await self.update(for_action=for_action, prioritized_player=player)
+
+    async def end(self):
+        self.is_over = True
+        await self.update()
+
+
+class TestEventQueue(IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.game = FakeGame()
+
+    async def test_clicks_in_batch_are_rendered_once_in_order(self):
+        self.game.events.submit(self.game.click, "A")
+        self.game.events.submit(self.game.click, "B", for_action=True)
+        await self.game.events.handle_batch()
+        self.assertEqual(self.game.rounds, [(["A", "B"], True, True, "A")])
+
+    async def test_click_during_window_joins_batch(self):
+        async def click_later():
+            await asyncio.sleep(BATCH_SECONDS / 2)
+            self.game.events.submit(self.game.click, "B")
+
+        self.game.events.submit(self.game.click, "A")
+        await asyncio.gather(self.game.events.handle_batch(), click_later())
+        self.assertEqual(len(self.game.rounds), 1)
+        self.assertEqual(self.game.rounds[0][0], ["A", "B"])
+
+    async def test_click_after_batch_is_next_round(self):
+        self.game.events.submit(self.game.click, "A")
+        await self.game.events.handle_batch()
+        self.game.events.submit(self.game.click, "B")
+        await self.game.events.handle_batch()
+        self.assertEqual([clicked for clicked, *_ in self.game.rounds], [["A"], ["A", "B"]])
+
+    async def test_batch_ending_game_is_rendered(self):
+        self.game.events.submit(self.game.click, "A")
+        self.game.events.submit(self.game.end)
+        await self.game.events.handle_batch()
+        self.assertTrue(self.game.is_over)
+        self.assertEqual(len(self.game.rounds), 1)
+
+    async def test_broken_event_does_not_stop_batch(self):
+        async def broken():
+            raise RuntimeError("broken")
+
+        self.game.events.submit(broken)
+        self.game.events.submit(self.game.click, "A")
+        with self.assertLogs("event_queue"):
+            await self.game.events.handle_batch()
+        self.assertEqual(self.game.rounds[0][0], ["A"])
+
+    async def test_update_outside_batch_is_applied_now(self):
+        await self.game.update(prioritized_player="A")
+        self.assertEqual(self.game.rounds, [([], True, True, "A")])
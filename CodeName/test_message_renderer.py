@@ -0,0 +1,119 @@
+import asyncio
+from types import SimpleNamespace
+from unittest import IsolatedAsyncioTestCase
+
+import discord
+
+from message_renderer import CachedComponentsMixin, MessageRenderer
+
+SEND_SECONDS = 0.05
+
+
+class FakeMessage:
+    def __init__(self, channel: "FakeChannel"):
+        self.channel = channel
+        self.edits = []
+        self.deleted = False
+
+    async def edit(self, **kwargs):
+        if self.deleted:
+            raise discord.errors.NotFound(SimpleNamespace(status=404, reason="Not Found"), "Unknown Message")
+        await asyncio.sleep(SEND_SECONDS)
+        self.edits.append(kwargs)
+
+
+class FakeChannel:
+    def __init__(self):
+        self.messages = []
+
+    async def send(self, content, view=None):
+        await asyncio.sleep(SEND_SECONDS)
+        message = FakeMessage(self)
+        self.messages.append(message)
+        return message
+
+
+class FakeView:
+    def __init__(self, label: str = "word"):
+        self.label = label
+
+    def to_components(self):
+        return [{"type": 1, "components": [{"type": 2, "label": self.label}]}]
+
+
+class TestMessageRenderer(IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.channel = FakeChannel()
+        self.renderer = MessageRenderer()
+
+    async def test_cancelled_send_is_finished_and_edited_later(self):
+        task = asyncio.create_task(self.renderer.render(self.channel, "first", FakeView()))
+        await asyncio.sleep(SEND_SECONDS / 2)
+        task.cancel()
+        await self.renderer.render(self.channel, "second", FakeView())
+        self.assertEqual(len(self.channel.messages), 1)
+        self.assertIs(self.renderer.message, self.channel.messages[0])
+        self.assertEqual(self.renderer.message.edits, [{"content": "second"}])
+
+    async def test_cancelled_edit_is_applied_by_next_render(self):
+        await self.renderer.render(self.channel, "first", FakeView())
+        task = asyncio.create_task(self.renderer.render(self.channel, "second", FakeView()))
+        await asyncio.sleep(SEND_SECONDS / 2)
+        task.cancel()
+        await self.renderer.render(self.channel, "second", FakeView())
+        self.assertEqual(self.renderer.message.edits, [{"content": "second"}])
+
+    async def test_only_changes_are_edited(self):
+        view = FakeView()
+        await self.renderer.render(self.channel, "content", view)
+        await self.renderer.render(self.channel, "content", view)
+        self.assertEqual(self.renderer.message.edits, [])
+        view.label = "changed"
+        await self.renderer.render(self.channel, "content", view)
+        self.assertEqual(self.renderer.message.edits, [{"view": view}])
+
+    async def test_deleted_message_is_sent_again(self):
+        await self.renderer.render(self.channel, "first", FakeView())
+        self.channel.messages[0].deleted = True
+        await self.renderer.render(self.channel, "second", FakeView())
+        self.assertEqual(len(self.channel.messages), 2)
+        self.assertIs(self.renderer.message, self.channel.messages[1])
+
+    async def test_renders_while_editing_are_coalesced(self):
+        await self.renderer.render(self.channel, "first", FakeView())
+        await asyncio.gather(*(self.renderer.render(self.channel, str(i), FakeView()) for i in range(5)))
+        self.assertEqual(self.renderer.message.edits, [{"content": "0"}, {"content": "4"}])
+
+
+class CachedView(CachedComponentsMixin, discord.ui.View):
+    pass
+
+
+class TestCachedComponentsMixin(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.view = CachedView()
+        self.button = discord.ui.Button(label="word")
+        self.view.add_item(self.button)
+
+    def get_button_dict(self):
+        return self.view.to_components()[0]["components"][0]
+
+    async def test_unchanged_view_returns_same_list(self):
+        self.assertIs(self.view.to_components(), self.view.to_components())
+
+    async def test_mutated_button_is_serialized_again(self):
+        for attr, value in [("label", "changed"), ("style", discord.ButtonStyle.green),
+                            ("emoji", "👪"), ("disabled", True)]:
+            with self.subTest(attr=attr):
+                setattr(self.button, attr, value)
+                self.assertEqual(self.get_button_dict(), self.button.to_component_dict())
+
+    async def test_select_options_are_tracked(self):
+        select = discord.ui.Select(placeholder="log", options=[discord.SelectOption(label="a")])
+        self.view.add_item(select)
+        cached = self.view.to_components()
+        select.options[0].label = "b"
+        select.append_option(discord.SelectOption(label="c"))
+        self.assertIsNot(self.view.to_components(), cached)
+        self.assertEqual([option["label"] for option in self.view.to_components()[1]["components"][0]["options"]],
+                         ["b", "c"])
@@ -0,0 +1,56 @@
+import tempfile
+from pathlib import Path
+from unittest import IsolatedAsyncioTestCase
+
+import discord
+
+from word_pack_select import WordPackSelect
+from word_pool import DEFAULT_PACK, WORD_PACKS_DIR, WordPool
+
+ANIMALS = ["いぬ", "ねこ", "うさぎ", "ぞう"]
+
+
+class FakeOpeningView(discord.ui.View):
+    def __init__(self):
+        super().__init__()
+        self.word_pack = DEFAULT_PACK
+
+
+class TestWordPackSelect(IsolatedAsyncioTestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.packs_dir = Path(temp_dir.name)
+        (self.packs_dir / "animals.txt").write_text("\n".join(ANIMALS), encoding="utf-8")
+        (self.packs_dir / "notes.md").write_text("Not a pack.", encoding="utf-8")
+        self.pool = WordPool()
+
+    async def test_not_added_with_default_pack_only(self):
+        opening = FakeOpeningView()
+        self.assertIsNone(WordPackSelect.add_if_choosable(self.pool, opening))
+        self.assertEqual(opening.children, [])
+
+    async def test_packs_in_dir_are_registered(self):
+        self.assertEqual(self.pool.register_dir(self.packs_dir), ["animals"])
+        self.assertEqual(self.pool.names, [DEFAULT_PACK, "animals"])
+        self.assertEqual(self.pool.register_dir(self.packs_dir / "missing"), [])
+
+    async def test_game_starts_with_chosen_pack(self):
+        self.pool.register_dir(self.packs_dir)
+        opening = FakeOpeningView()
+        select = WordPackSelect.add_if_choosable(self.pool, opening)
+        self.assertIn(select, opening.children)
+        self.assertEqual([option.label for option in select.options], [DEFAULT_PACK, "animals"])
+
+        select.choose("animals")
+        self.assertEqual(opening.word_pack, "animals")
+        self.assertEqual([option.default for option in select.options], [False, True])
+        board = self.pool.draw_board(2, 2, pack_name=opening.word_pack)
+        self.assertCountEqual([word for row in board for word in row], ANIMALS)
+
+    async def test_shipped_packs_fill_default_board(self):
+        names = self.pool.register_dir(WORD_PACKS_DIR)
+        self.assertTrue(names)
+        for name in names:
+            board = self.pool.draw_board(5, 5, pack_name=name)
+            self.assertEqual(len({word for row in board for word in row}), 25)
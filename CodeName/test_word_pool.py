@@ -0,0 +1,97 @@
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from word_pool import DEFAULT_PACK, WordPack, WordPool, get_display_width, make_board
+
+WORDS = ["りんご", "ごりら", "ラッパ", "apple", "ぱんだ", "だちょう", "うどん", "あいうえおか"]
+
+
+class TestWordPack(TestCase):
+    def test_display_width(self):
+        self.assertEqual(get_display_width("apple"), 5)
+        self.assertEqual(get_display_width("りんご"), 6)
+        self.assertEqual(get_display_width("ｱｲｳ"), 3)  # Half-width katakana.
+
+    def test_words_are_bucketed_without_duplicates_and_blanks(self):
+        pack = WordPack("test", ["りんご\n", "りんご", "", "  ", "apple"])
+        self.assertEqual(len(pack), 2)
+        self.assertEqual(pack.buckets, {5: ("apple",), 6: ("りんご",)})
+
+    def test_candidates_are_filtered_by_width(self):
+        pack = WordPack("test", WORDS)
+        self.assertNotIn("あいうえおか", pack.get_candidates(8))
+        self.assertNotIn("だちょう", pack.get_candidates(6))
+        self.assertIn("apple", pack.get_candidates(6))
+        self.assertEqual(len(pack.get_candidates(12)), len(WORDS))
+
+    def test_sample_does_not_mutate_pack(self):
+        pack = WordPack("test", WORDS)
+        buckets = dict(pack.buckets)
+        candidates = pack.get_candidates()
+        for _ in range(10):
+            words = pack.sample(4)
+            words.clear()
+        self.assertEqual(pack.buckets, buckets)
+        self.assertEqual(pack.get_candidates(), candidates)
+
+    def test_sample_is_unique_and_fits_width(self):
+        pack = WordPack("test", WORDS)
+        words = pack.sample(6, max_width=6)
+        self.assertEqual(len(set(words)), 6)
+        self.assertTrue(all(get_display_width(word) <= 6 for word in words))
+
+    def test_undersized_pack_raises_value_error(self):
+        pack = WordPack("test", WORDS)
+        with self.assertRaises(ValueError):
+            pack.sample(len(WORDS) + 1, max_width=12)
+        with self.assertRaises(ValueError):
+            pack.sample(7, max_width=6)  # Only 6 words fit.
+
+
+class TestMakeBoard(TestCase):
+    def test_board_shape(self):
+        board = make_board(WordPack("test", WORDS), row_count=2, column_count=3)
+        self.assertEqual([len(row) for row in board], [3, 3])
+        words = [word for row in board for word in row]
+        self.assertEqual(len(set(words)), 6)
+
+    def test_undersized_pack(self):
+        with self.assertRaises(ValueError):
+            make_board(WordPack("test", WORDS), row_count=5, column_count=5)
+
+
+class TestWordPool(TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.path = Path(temp_dir.name) / "words.txt"
+        self.path.write_text("\n".join(WORDS), encoding="utf-8")
+        self.pool = WordPool()
+        self.pool.register("test", self.path)
+
+    def test_pack_is_loaded_once_and_shared(self):
+        self.assertIs(self.pool.get("test"), self.pool.get("test"))
+        self.assertEqual(len(self.pool.get("test")), len(WORDS))
+
+    def test_register_again_reloads(self):
+        pack = self.pool.get("test")
+        self.path.write_text("apple", encoding="utf-8")
+        self.pool.register("test", self.path)
+        self.assertIsNot(self.pool.get("test"), pack)
+        self.assertEqual(len(self.pool.get("test")), 1)
+
+    def test_unknown_pack_raises_key_error(self):
+        with self.assertRaises(KeyError):
+            self.pool.get("unknown")
+
+    def test_names(self):
+        self.assertEqual(self.pool.names, [DEFAULT_PACK, "test"])
+
+    def test_draw_board(self):
+        board = self.pool.draw_board(2, 2, pack_name="test")
+        self.assertEqual([len(row) for row in board], [2, 2])
+
+    def test_default_pack_fills_default_board(self):
+        board = self.pool.draw_board(5, 5)
+        self.assertEqual(len({word for row in board for word in row}), 25)
@@ -0,0 +1,40 @@
+from typing import Optional
+
+import discord
+
+from word_pool import WordPool
+
+
+class WordPackSelect(discord.ui.Select):
+    """
+    Lets players choose a pack registered in the pool before the game starts.
+
+    The chosen name is set to word_pack of the opening view, which the game is started with.
+
+    Examples
+    --------
+    WordPackSelect.add_if_choosable(word_pool, opening_view, placeholder="お題パック")
+    """
+
+    def __init__(self, pool: WordPool, opening: discord.ui.View, **kwargs):
+        options = [discord.SelectOption(label=name, default=name == opening.word_pack) for name in pool.names[:25]]
+        super().__init__(options=options, **kwargs)
+        self.opening = opening
+
+    @classmethod
+    def add_if_choosable(cls, pool: WordPool, opening: discord.ui.View, **kwargs) -> Optional["WordPackSelect"]:
+        """Add to the opening view only if there is a pack other than the default."""
+        if len(pool.names) < 2:
+            return None
+        select = cls(pool, opening, **kwargs)
+        opening.add_item(select)
+        return select
+
+    def choose(self, name: str) -> None:
+        self.opening.word_pack = name
+        for option in self.options:
+            option.default = option.label == name
+
+    async def callback(self, interaction: discord.Interaction):
+        self.choose(self.values[0])
+        await interaction.response.edit_message(view=self.opening)
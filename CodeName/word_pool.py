@@ -0,0 +1,112 @@
+import random
+import unicodedata
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+DEFAULT_PACK = "default"
+DEFAULT_WORDS_PATH = Path(__file__).parent / "default_words.txt"
+WORD_PACKS_DIR = Path(__file__).parent / "word_packs"  # Each <name>.txt is registered as pack <name> on startup.
+MAX_WORD_WIDTH = 8  # Buttons get wider from 5 half-width spaces. 4 full-width characters are still acceptable.
+
+
+def get_display_width(word: str) -> int:
+    """Half-width character is 1, full-width character is 2."""
+    return sum(2 if unicodedata.east_asian_width(char) in "FWA" else 1 for char in word)
+
+
+class WordPack:
+    """Words bucketed by display width. Never mutated after loading, so games can share it."""
+
+    def __init__(self, name: str, words: Iterable[str]):
+        self.name = name
+        buckets: Dict[int, List[str]] = {}
+        for word in dict.fromkeys(word.strip() for word in words):
+            if word:
+                buckets.setdefault(get_display_width(word), []).append(word)
+        self.buckets: Dict[int, Tuple[str, ...]] = {width: tuple(words) for width, words in sorted(buckets.items())}
+        self._candidates: Dict[int, Tuple[str, ...]] = {}
+
+    @classmethod
+    def from_file(cls, name: str, path: Path) -> "WordPack":
+        with path.open(encoding="utf-8") as f:
+            return cls(name, f)
+
+    def get_candidates(self, max_width: int = MAX_WORD_WIDTH) -> Tuple[str, ...]:
+        """Words which fit in max_width. Built once per max_width."""
+        try:
+            return self._candidates[max_width]
+        except KeyError:
+            candidates = tuple(word for width, words in self.buckets.items() if width <= max_width for word in words)
+            self._candidates[max_width] = candidates
+            return candidates
+
+    def sample(self, count: int, max_width: int = MAX_WORD_WIDTH) -> List[str]:
+        """
+        Raises
+        ------
+        ValueError
+            If the pack doesn't have enough words which fit in max_width.
+        """
+        return random.sample(self.get_candidates(max_width), count)
+
+    def __len__(self):
+        return sum(len(words) for words in self.buckets.values())
+
+
+class WordPool:
+    """
+    Named word packs, each loaded from file only once when it is first used.
+
+    Examples
+    --------
+    word_pool = WordPool()
+    word_pool.register("animals", Path("animal_words.txt"))
+    word_pool.register_dir(WORD_PACKS_DIR)
+    board = word_pool.draw_board(5, 5, pack_name="animals")
+    """
+
+    def __init__(self):
+        self._paths: Dict[str, Path] = {DEFAULT_PACK: DEFAULT_WORDS_PATH}
+        self._packs: Dict[str, WordPack] = {}
+
+    def register(self, name: str, path: Path) -> None:
+        self._paths[name] = path
+        self._packs.pop(name, None)
+
+    def register_dir(self, directory: Path) -> List[str]:
+        """
+        Register each text file in the directory as the pack named after the file. Nothing if it doesn't exist.
+
+        Returns
+        -------
+        List[str]
+            Names of the registered packs.
+        """
+        if not directory.is_dir():
+            return []
+        names = []
+        for path in sorted(directory.glob("*.txt")):
+            self.register(path.stem, path)
+            names.append(path.stem)
+        return names
+
+    def get(self, name: str = DEFAULT_PACK) -> WordPack:
+        try:
+            return self._packs[name]
+        except KeyError:
+            pack = self._packs[name] = WordPack.from_file(name, self._paths[name])
+            return pack
+
+    @property
+    def names(self) -> List[str]:
+        return list(self._paths)
+
+    def draw_board(self, row_count: int, column_count: int, pack_name: str = DEFAULT_PACK,
+                   max_width: int = MAX_WORD_WIDTH) -> List[List[str]]:
+        return make_board(self.get(pack_name), row_count, column_count, max_width)
+
+
+def make_board(pack: WordPack, row_count: int, column_count: int,
+               max_width: int = MAX_WORD_WIDTH) -> List[List[str]]:
+    words = pack.sample(row_count * column_count, max_width)
+    return [words[y * column_count:(y + 1) * column_count] for y in range(row_count)]
@@ -1,15 +1,18 @@
 import argparse
+import asyncio
 import logging
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional
 
 import discord
 import unicodedata
 from discord.ext.commands import Bot, Cog, command, Context
-from pandas import DataFrame
 from utils.cogs.emoji_timer.emoji_timer import EmojiTimer
+from utils.channel_config import ChannelConfigStore
 from utils.cogs.voice_text_linker import VoiceTextLinker
 from utils.other import get_token
+from utils.sound_library import SoundLibrary
+from utils.voice_connections import VoiceConnectionManager
 
 from .cogs.emoji_timer.countdown import CountDownTimer
 
@@ -27,38 +30,55 @@ class HurryCog(VoiceTextLinker, EmojiTimer, EmojiRegister):
     BREAK_MODE = "break"
     DYNAMIC = "dynamic"
     CHIME_PATH = Path() / "../sound/chime_5sec.wav"
+    CHIME = "chime"
+    SOUNDS = {CHIME: CHIME_PATH}  # Name of sound: path. Add cues here, they are transcoded once on ready.
     CHANNEL_SETTING_FILE = "../channels_settings.json"
+    VOICE_IDLE_SECONDS = 60.0  # Leaves voice channel after this long without chimes.
 
     def __init__(self, bot_: Bot) -> None:
+        self.sounds: SoundLibrary = SoundLibrary()
+        self.voice_connections: VoiceConnectionManager = VoiceConnectionManager(self.VOICE_IDLE_SECONDS)
+        for name, path in self.SOUNDS.items():
+            self.sounds.register(name, path)
         VoiceTextLinker.__init__(self, bot_)
         EmojiTimer.__init__(self, bot_)
 
-    def load_settings(self):
-        VoiceTextLinker.load_settings(self)
-        self.db = DataFrame(self.db)
+    def make_links(self, db: Optional[Dict] = None) -> ChannelConfigStore:
+        """Configs are the only index of links, so minutes and links never disagree."""
+        configs = ChannelConfigStore()
+        if db:
+            configs.update(db)
+        return configs
 
-    def get_tc(self, voicechat_id: int) -> Optional[discord.TextChannel]:
-        tc_id = self._get_data("tc", vc=voicechat_id)
-        return self.bot.get_channel(tc_id)
+    def load_settings(self):
+        """Configs in the file are added over the links passed as db, as VoiceTextLinker does."""
+        for config in ChannelConfigStore.load(self.setting_json_path):
+            self.links.add(config)
 
-    def get_vc(self, textchat_id: int) -> discord.VoiceChannel:
-        vc_id = self._get_data("vc", tc=textchat_id)
-        return self.bot.get_channel(vc_id)
+    def settings_to_json(self):
+        return self.links.to_columns()
 
-    def _get_work_minutes(self, voicechat_id: int) -> int:
-        return self._get_data("work_minutes", vc=voicechat_id)
+    def _get_work_minutes(self, voicechat_id: int) -> Optional[float]:
+        config = self.links.get_by_vc(voicechat_id)
+        return config and config.work_minutes
 
-    def _get_break_minutes(self, voicechat_id: int) -> int:
-        return self._get_data("break_minutes", vc=voicechat_id)
+    def _get_break_minutes(self, voicechat_id: int) -> Optional[float]:
+        config = self.links.get_by_vc(voicechat_id)
+        return config and config.break_minutes
 
-    def _get_data(self, target_data_name: str, **kwargs):
-        key, val = kwargs.items().__iter__().__next__()
-        filtered_df = self.db.query(f"{key} == {val}")
-        return getattr(filtered_df, target_data_name)[0]
+    async def cog_unload(self) -> None:
+        VoiceTextLinker.cog_unload(self)
+        await self.voice_connections.close()
 
     @Cog.listener()
     async def on_ready(self) -> None:
-        await EmojiTimer.on_ready(self)
+        await asyncio.gather(EmojiTimer.on_ready(self), self.sounds.load())
+        await VoiceTextLinker.on_ready(self)  # Starts timers of channels occupied already, after emojis are loaded.
+
+    async def on_occupied_on_ready(self, voice_channel: discord.VoiceChannel,
+                                   text_channel: discord.TextChannel) -> None:
+        logger.info(f"Members were already in {voice_channel.name} when the bot got ready.")
+        await self.countdown(tc=text_channel)
 
     async def on_connect_to_targeted_vc(self,
                                         member: discord.Member,
@@ -73,16 +93,9 @@ class HurryCog(VoiceTextLinker, EmojiTimer, EmojiRegister):
                                              member: discord.Member,
                                              voice: discord.VoiceState,
                                              text_channel: discord.TextChannel) -> None:
-        staying_members = voice.channel.members
-
-        def user_remains():
-            if staying_members:
-                if any(map(lambda user: not user.bot, staying_members)):
-                    return True
-            return False
-
-        if user_remains():
-            logger.debug(f"{member.name} left from the voice channel, and {staying_members} are still in the room.")
+        human_count = self.get_human_count(voice.channel.id)
+        if human_count:
+            logger.debug(f"{member.name} left from the voice channel, and {human_count} members are still in the room.")
             return
         try:
             timer: CountDownTimer = self._timer_dict[text_channel.id]
@@ -92,8 +105,8 @@ class HurryCog(VoiceTextLinker, EmojiTimer, EmojiRegister):
         else:
             timer.stop()
             voice_client = member.guild.voice_client
-            if voice_client:
-                await voice_client.disconnect(force=True)
+            if voice_client is not None and voice_client.channel == voice.channel:  # May be chiming elsewhere.
+                await self.voice_connections.disconnect(member.guild)
 
     @command()
     async def countdown(self, ctx: Context = None,
@@ -127,47 +140,18 @@ class HurryCog(VoiceTextLinker, EmojiTimer, EmojiRegister):
             await self.countdown(minutes=next_minutes, tc=message.channel, mode=next_mode)
 
     async def play_chime(self, voice_channel: discord.VoiceChannel) -> None:
-        try:
-            voice_protocol: discord.VoiceProtocol = await voice_channel.connect()
-        except discord.errors.ClientException as e:
-            if e.args[0] == "Already connected to a voice channel.":
-                # noinspection PyTypeChecker
-                voice_protocol = channel.guild.voice_client
-                if voice_protocol.channel != voice_channel:
-                    await voice_protocol.disconnect(force=True)
-                    try:
-                        voice_protocol: discord.VoiceProtocol = await voice_channel.connect()
-                    except discord.errors.ClientException:
-                        raise
-
-        # def my_after(error):
-        #     if error:
-        #         logger.warning(error)
-        #     try:
-        #         coro = voice_protocol.disconnect()
-        #     except discord.errors.ClientException:
-        #         pass
-        #     # noinspection PyUnboundLocalVariable
-        #     fut = asyncio.run_coroutine_threadsafe(coro, bot.loop)
-        #     # noinspection PyBroadException
-        #     try:
-        #         fut.result()
-        #     except:
-        #         pass
-
-        # noinspection PyUnboundLocalVariable
-        voice_protocol.play(self.get_music_source())  # after=my_after)
-
-    @classmethod
-    def get_music_source(cls) -> discord.FFmpegOpusAudio:
-        return discord.FFmpegOpusAudio(cls.CHIME_PATH)
-
-    def get_minutes(self, tc: discord.TextChannel, mode: str = WORK_MODE) -> int:
-        vc = self.get_vc(tc.id)
+        """Queued in the guild. Doesn't wait for the chime to finish."""
+        self.voice_connections.enqueue(voice_channel, self.get_music_source())
+
+    def get_music_source(self, name: str = CHIME) -> discord.AudioSource:
+        return self.sounds.get_source(name)
+
+    def get_minutes(self, tc: discord.TextChannel, mode: str = WORK_MODE) -> Optional[float]:
+        vc_id = self.links.get_vc_id(tc.id)
         if mode == self.WORK_MODE:
-            return self._get_work_minutes(vc.id)
+            return self._get_work_minutes(vc_id)
         elif mode == self.BREAK_MODE:
-            return self._get_break_minutes(vc.id)
+            return self._get_break_minutes(vc_id)
 
     def str_to_minutes(self,
                        string: str  # ex. "50", "50:15"
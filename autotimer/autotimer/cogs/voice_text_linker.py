@@ -1,9 +1,90 @@
+import asyncio
 import json
+from collections.abc import Iterable, KeysView, Mapping
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Awaitable, Callable, Dict, Optional, Union
 
 import discord
 from discord.ext.commands import Cog, command
+from utils.settings_writer import DebouncedJsonWriter, dump_json_atomically
+
+LinksTypes = Union[Mapping, Iterable[tuple]]
+
+
+class ChannelLinks:
+    """Index of links between voice channel and text channel, looked up in O(1) from both sides.
+
+    A voice channel is linked with only 1 text channel, and vice versa.
+    Ids are normalized to int, since keys loaded from json are str.
+    """
+
+    def __init__(self, links: Optional[LinksTypes] = None) -> None:
+        """
+        Parameters
+        ----------
+        links : Mapping or Iterable of tuple
+            Pairs of id of voice channel and id of text channel.
+        """
+        self._tc_by_vc: Dict[int, int] = {}
+        self._vc_by_tc: Dict[int, int] = {}
+        if links:
+            self.update(links)
+
+    def update(self, links: LinksTypes) -> None:
+        if isinstance(links, Mapping):
+            links = links.items()
+        for vc_id, tc_id in links:
+            self.link(vc_id, tc_id)
+
+    def link(self, vc_id: Union[int, str], tc_id: Union[int, str]) -> None:
+        vc_id, tc_id = int(vc_id), int(tc_id)
+        self.unlink_vc(vc_id)
+        self.unlink_tc(tc_id)
+        self._tc_by_vc[vc_id] = tc_id
+        self._vc_by_tc[tc_id] = vc_id
+
+    def unlink_vc(self, vc_id: int) -> Optional[int]:
+        """Returns id of text channel which was linked."""
+        tc_id = self._tc_by_vc.pop(vc_id, None)
+        if tc_id is not None:
+            del self._vc_by_tc[tc_id]
+        return tc_id
+
+    def unlink_tc(self, tc_id: int) -> Optional[int]:
+        """Returns id of voice channel which was linked."""
+        vc_id = self._vc_by_tc.pop(tc_id, None)
+        if vc_id is not None:
+            del self._tc_by_vc[vc_id]
+        return vc_id
+
+    def get_tc_id(self, vc_id: int) -> Optional[int]:
+        return self._tc_by_vc.get(vc_id)
+
+    def get_vc_id(self, tc_id: int) -> Optional[int]:
+        return self._vc_by_tc.get(tc_id)
+
+    @property
+    def vc_ids(self) -> KeysView[int]:
+        return self._tc_by_vc.keys()
+
+    def items(self):
+        return self._tc_by_vc.items()
+
+    def to_dict(self) -> Dict[int, int]:
+        return dict(self._tc_by_vc)
+
+    def __len__(self) -> int:
+        return len(self._tc_by_vc)
+
+
+@dataclass
+class VoiceEventWindow:
+    """Joins and leaves of a linked voice channel within the debounce window."""
+    human_count_at_open: int
+    task: Optional[asyncio.Task] = None
+    latest_connect: Optional[tuple] = None  # Arguments of the latest join.
+    latest_disconnect: Optional[tuple] = None  # Arguments of the latest leave.
 
 
 # noinspection SpellCheckingInspection
@@ -18,9 +99,11 @@ class VoiceTextLinker(Cog):
     LINK_SAME = "This text chat is already linked with your current voice chat."
     LINK_OTHER = "Your current voice channel was already linked with ✏{text_channel_name}." \
                  "To link with this text channel, past one is removed."
+    VOICE_DEBOUNCE_SECONDS = 3.0
 
     def __init__(self, bot: discord.ext.commands.Bot,
-                 db: Dict = None, setting_json_path: str = None, saves_settings=True) -> None:
+                 db: Dict = None, setting_json_path: str = None, saves_settings=True,
+                 voice_debounce_seconds: float = VOICE_DEBOUNCE_SECONDS) -> None:
         """
         Parameters
         ----------
@@ -31,23 +114,32 @@ class VoiceTextLinker(Cog):
             The json file should only have 1 associative array. Key is id of voicechannel, value is id of textchannel.
         saves_settings : boolean
             If True, the bot saves settings as json and can load it even after reboot.
+            Changes are written in the background in batches.
+        voice_debounce_seconds : float
+            Joins and leaves of a linked voice channel within this window are handled at most once,
+            depending on whether the number of members increased or decreased. 0 handles every event immediately.
         """
         self.bot = bot
-        if db:
-            self.db = db
-        else:
-            self.db = {}
+        self.links: ChannelLinks = self.make_links(db)
+        self.voice_debounce_seconds: float = voice_debounce_seconds
+        self._voice_windows: Dict[int, VoiceEventWindow] = {}  # id of linked voice channel: open window
+        self._human_counts: Dict[int, int] = {}  # id of linked voice channel: number of members except bots
 
-        self.does_save = True
+        self.does_save = saves_settings
         if setting_json_path:
             self.setting_json_path = Path(setting_json_path)
         else:
             self.setting_json_path = Path(self.CHANNEL_SETTING_FILE)
+        self.settings_writer = DebouncedJsonWriter(self.setting_json_path, self.settings_to_json)
         self.make_sure_file_exists()
         self.load_settings()
 
         super().__init__(bot)
 
+    def make_links(self, db: Optional[LinksTypes] = None) -> ChannelLinks:
+        """Override this to index links by other object which has the same methods as ChannelLinks."""
+        return ChannelLinks(db)
+
     def make_sure_file_exists(self):
         if not self.does_save:
             return
@@ -56,68 +148,147 @@ class VoiceTextLinker(Cog):
 
     def load_settings(self):
         with self.setting_json_path.open(mode="r") as f:
-            self.db.update(json.load(f))
+            self.links.update(json.load(f))
+
+    def settings_to_json(self):
+        return self.links.to_dict()
 
     def save_settings(self, content: Optional[Dict] = None):
+        """Write settings synchronously. Use request_save in event handlers not to block the event loop."""
         if content:
-            self.db.update[content]
-        with self.setting_json_path.open(mode="w") as f:
-            json.dump(self.db, f)
+            self.links.update(content)
+        dump_json_atomically(self.setting_json_path, self.settings_to_json())
+
+    def request_save(self) -> None:
+        if self.does_save:
+            self.settings_writer.mark_dirty()
+
+    def cog_unload(self) -> None:
+        for window in self._voice_windows.values():
+            window.task.cancel()
+        self._voice_windows.clear()
+        if self.does_save:
+            self.settings_writer.close()
 
     @command()
     async def link(self, ctx: discord.ext.commands.Context, **kwargs) -> None:
         if not ctx.author.voice:
             await self.on_voicechannel_not_found(ctx)
+            return
         voice_channel = ctx.author.voice.channel
 
         linked_textchat = self.get_tc(voice_channel.id)
         if linked_textchat:
             if linked_textchat.id == ctx.channel.id:
                 await self.on_link_same(ctx, voice_channel)
-            elif is_linked_already():
-                await self.on_link_other(ctx, voice_channel)
+            else:
+                await self.on_link_other(ctx, voice_channel, linked_textchat)
         else:
             await self.on_link_successfully(ctx, voice_channel)
 
-    async def on_voicechannel_not_found(self):
+    async def on_voicechannel_not_found(self, ctx):
         await ctx.send(self.VOICECHANNEL_NOTFOUND)
 
     async def on_link_successfully(self, ctx, vc):
-        self.db[voice_channel.id] = ctx.channel.id
+        self.links.link(vc.id, ctx.channel.id)
+        self._human_counts[vc.id] = count_humans(vc)
+        self.request_save()
         await ctx.send(self.SUCCESSFULLY_LINKED.format(voice_channel_name=vc.name, text_channel_name=ctx.channel.name))
 
     async def on_link_same(self, ctx, vc):
         await ctx.send(self.LINK_SAME)
 
-    async def on_link_other(self, ctx, vc):
-        await ctx.send(self.LINK_OTHER)
+    async def on_link_other(self, ctx, vc, linked_tc):
+        await ctx.send(self.LINK_OTHER.format(text_channel_name=linked_tc.name))
         await self.on_link_successfully(ctx, vc)
 
-    def get_vc(self, textchat_id: int) -> discord.VoiceChannel:
-        vc_id = [vc_id for vc_id, tc_id in self.db.items() if textchat_id == tc_id][0]
-        vc = self.bot.get_channel(vc_id)
-        return vc
+    def get_vc(self, textchat_id: int) -> Optional[discord.VoiceChannel]:
+        vc_id = self.links.get_vc_id(textchat_id)
+        if vc_id is not None:
+            return self.bot.get_channel(vc_id)
 
     def get_tc(self, voicechat_id: int) -> Optional[discord.TextChannel]:
-        text_id = self.db.get(voicechat_id, None)
+        text_id = self.links.get_tc_id(voicechat_id)
         if text_id is not None:
             return self.bot.get_channel(text_id)
 
+    def get_human_count(self, voicechat_id: int) -> int:
+        """Number of members except bots in the linked voice channel, kept up to date by voice state updates."""
+        return self._human_counts.get(voicechat_id, 0)
+
+    def reconcile_human_counts(self) -> None:
+        """Count members of all linked voice channels once. Members may have joined while the bot was offline."""
+        self._human_counts.clear()
+        for vc_id in self.links.vc_ids:
+            vc = self.bot.get_channel(vc_id)
+            if vc is not None:
+                self._human_counts[vc_id] = count_humans(vc)
+
+    @Cog.listener()
+    async def on_ready(self) -> None:
+        self.reconcile_human_counts()
+        occupied = [(self.bot.get_channel(vc_id), self.get_tc(vc_id))
+                    for vc_id, count in self._human_counts.items() if count]
+        await asyncio.gather(*(self.on_occupied_on_ready(vc, tc) for vc, tc in occupied if tc))
+
+    async def on_occupied_on_ready(self, voice_channel: discord.VoiceChannel, textchannel: discord.TextChannel) -> None:
+        """Called for each linked voice channel which members are already in when the bot gets ready."""
+        pass
+
     @Cog.listener()
     async def on_voice_state_update(self, member: discord.Member,
                                     before: discord.VoiceState, after: discord.VoiceState) -> None:
         if member.bot:
             return
-        if before.channel == after.channel:
+        if before.channel == after.channel:  # Mute, deafen and so on.
+            return
+        linked_vc_ids = self.links.vc_ids
+        if before.channel and before.channel.id in linked_vc_ids:
+            human_count = self.get_human_count(before.channel.id)
+            self._human_counts[before.channel.id] = max(human_count - 1, 0)
+            await self._handle_voice_event(before.channel.id, human_count, disconnect=(member, before))
+        if after.channel and after.channel.id in linked_vc_ids:
+            human_count = self.get_human_count(after.channel.id)
+            self._human_counts[after.channel.id] = human_count + 1
+            await self._handle_voice_event(after.channel.id, human_count, connect=(member, after))
+
+    async def _handle_voice_event(self, vc_id: int, human_count_before: int,
+                                  connect: Optional[tuple] = None, disconnect: Optional[tuple] = None) -> None:
+        """
+        Debounce events per voice channel.
+
+        When the window closes, the number of members is compared with the one when the window opened.
+        If it increased, on_connect_to_targeted_vc is called with the latest join.
+        If it decreased, on_disconnect_from_targeted_vc is called with the latest leave.
+        """
+        if self.voice_debounce_seconds <= 0:
+            if disconnect:
+                await self._dispatch_voice_event(vc_id, self.on_disconnect_from_targeted_vc, disconnect)
+            if connect:
+                await self._dispatch_voice_event(vc_id, self.on_connect_to_targeted_vc, connect)
             return
-        if before.channel:
-            textchannel = self.get_tc(before.channel.id)
-            if textchannel:
-                await self.on_disconnect_from_targeted_vc(member, before, textchannel)
-        if after.channel:
-            textchannel = self.get_tc(after.channel.id)
-            if textchannel:
-                await self.on_connect_to_targeted_vc(member, after, textchannel)
+        window = self._voice_windows.get(vc_id)
+        if window is None:
+            window = self._voice_windows[vc_id] = VoiceEventWindow(human_count_before)
+            window.task = asyncio.create_task(self._close_voice_window(vc_id))
+        if connect:
+            window.latest_connect = connect
+        if disconnect:
+            window.latest_disconnect = disconnect
+
+    async def _close_voice_window(self, vc_id: int) -> None:
+        await asyncio.sleep(self.voice_debounce_seconds)  # Cancelled on unload.
+        window = self._voice_windows.pop(vc_id)
+        change = self.get_human_count(vc_id) - window.human_count_at_open
+        if change > 0:
+            await self._dispatch_voice_event(vc_id, self.on_connect_to_targeted_vc, window.latest_connect)
+        elif change < 0:
+            await self._dispatch_voice_event(vc_id, self.on_disconnect_from_targeted_vc, window.latest_disconnect)
+
+    async def _dispatch_voice_event(self, vc_id: int, handler: Callable[..., Awaitable[None]], args: tuple) -> None:
+        textchannel = self.get_tc(vc_id)  # Looked up now, since the link may be changed while waiting.
+        if textchannel:
+            await handler(*args, textchannel)
 
     async def on_connect_to_targeted_vc(self,
                                         member: discord.Member,
@@ -130,3 +301,7 @@ class VoiceTextLinker(Cog):
                                              disconnected_voice: discord.VoiceState,
                                              textchannel: discord.TextChannel) -> None:
         pass
+
+
+def count_humans(voice_channel: discord.VoiceChannel) -> int:
+    return sum(1 for member in voice_channel.members if not member.bot)
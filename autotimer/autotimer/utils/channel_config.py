@@ -0,0 +1,116 @@
+import json
+from collections.abc import Iterable, KeysView, Mapping
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Union
+
+
+@dataclass
+class ChannelConfig:
+    vc: int
+    tc: int
+    work_minutes: Optional[float] = None
+    break_minutes: Optional[float] = None
+
+
+class ChannelConfigStore:
+    """
+    Configs of linked channels, looked up by id of voice channel or text channel in O(1).
+
+    Reads and writes the column oriented layout of channels_settings.json, which used to be written by pandas.
+    ex. {"vc": {"0": 123, "1": 456}, "tc": {"0": 789, "1": 321}, "work_minutes": {"0": 30.0, "1": null}, ...}
+
+    Has the same lookup methods as ChannelLinks, so it can be the index of links of VoiceTextLinker by itself.
+    """
+    COLUMNS = tuple(field.name for field in fields(ChannelConfig))
+
+    def __init__(self) -> None:
+        self._by_vc: Dict[int, ChannelConfig] = {}
+        self._by_tc: Dict[int, ChannelConfig] = {}
+
+    def add(self, config: ChannelConfig) -> None:
+        """Replaces configs which have the same voice channel or text channel."""
+        self.remove_vc(config.vc)
+        self.remove_tc(config.tc)
+        self._by_vc[config.vc] = config
+        self._by_tc[config.tc] = config
+
+    def link(self, vc_id: int, tc_id: int) -> ChannelConfig:
+        """Link channels keeping minutes of the voice channel if it was configured."""
+        old = self.get_by_vc(vc_id)
+        config = ChannelConfig(vc=vc_id, tc=tc_id,
+                               work_minutes=old and old.work_minutes, break_minutes=old and old.break_minutes)
+        self.add(config)
+        return config
+
+    def update(self, links: Union[Mapping, Iterable[tuple]]) -> None:
+        """Link pairs of id of voice channel and id of text channel. Ids may be str as keys loaded from json."""
+        if isinstance(links, Mapping):
+            links = links.items()
+        for vc_id, tc_id in links:
+            self.link(int(vc_id), int(tc_id))
+
+    def remove_vc(self, vc_id: int) -> Optional[ChannelConfig]:
+        config = self._by_vc.pop(vc_id, None)
+        if config is not None:
+            del self._by_tc[config.tc]
+        return config
+
+    def remove_tc(self, tc_id: int) -> Optional[ChannelConfig]:
+        config = self._by_tc.pop(tc_id, None)
+        if config is not None:
+            del self._by_vc[config.vc]
+        return config
+
+    def get_by_vc(self, vc_id: int) -> Optional[ChannelConfig]:
+        return self._by_vc.get(vc_id)
+
+    def get_by_tc(self, tc_id: int) -> Optional[ChannelConfig]:
+        return self._by_tc.get(tc_id)
+
+    def get_tc_id(self, vc_id: int) -> Optional[int]:
+        config = self._by_vc.get(vc_id)
+        return config and config.tc
+
+    def get_vc_id(self, tc_id: int) -> Optional[int]:
+        config = self._by_tc.get(tc_id)
+        return config and config.vc
+
+    @property
+    def vc_ids(self) -> KeysView[int]:
+        return self._by_vc.keys()
+
+    @classmethod
+    def from_columns(cls, columns: Dict[str, Dict[str, object]]) -> "ChannelConfigStore":
+        store = cls()
+        for row in columns.get("vc", {}):
+            vc, tc = columns["vc"][row], columns["tc"][row]
+            if vc is None or tc is None:
+                continue
+            store.add(ChannelConfig(vc=int(vc), tc=int(tc),
+                                    work_minutes=columns.get("work_minutes", {}).get(row),
+                                    break_minutes=columns.get("break_minutes", {}).get(row)))
+        return store
+
+    def to_columns(self) -> Dict[str, Dict[str, object]]:
+        configs = list(self)
+        return {name: {str(row): getattr(config, name) for row, config in enumerate(configs)}
+                for name in self.COLUMNS}
+
+    @classmethod
+    def load(cls, path: Path) -> "ChannelConfigStore":
+        with path.open(mode="r") as f:
+            return cls.from_columns(json.load(f))
+
+    def dump(self, path: Path) -> None:
+        with path.open(mode="w") as f:
+            json.dump(self.to_columns(), f, indent=2)
+
+    def __iter__(self) -> Iterator[ChannelConfig]:
+        return iter(self._by_vc.values())
+
+    def __len__(self) -> int:
+        return len(self._by_vc)
+
+    def __contains__(self, vc_id: int) -> bool:
+        return vc_id in self._by_vc
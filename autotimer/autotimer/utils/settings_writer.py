@@ -0,0 +1,82 @@
+import asyncio
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def dump_json_atomically(path: Path, content) -> None:
+    """Truncated file is never left even if the process dies while writing."""
+    with tempfile.NamedTemporaryFile(mode="w", dir=path.parent, prefix=path.name, suffix=".tmp", delete=False) as f:
+        json.dump(content, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(f.name, path)
+
+
+class DebouncedJsonWriter:
+    """
+    Writes settings to json file in the background, at most once per delay.
+
+    Changes are only marked as dirty, and a burst of changes is written by 1 flush.
+    Content is serialized on the event loop, so the thread writing file never sees half-updated objects.
+
+    Examples
+    --------
+    writer = DebouncedJsonWriter(Path("settings.json"), lambda: settings)
+    settings["key"] = "value"
+    writer.mark_dirty()
+    ...
+    writer.close()  # On shutdown.
+    """
+    DEFAULT_DELAY = 2.0
+
+    def __init__(self, path: Path, serialize: Callable[[], object], delay: float = DEFAULT_DELAY) -> None:
+        """
+        Parameters
+        ----------
+        serialize : Callable[[], object]
+            Returns the content to dump as json.
+        delay : float
+            Seconds to wait for other changes before writing.
+        """
+        self.path: Path = path
+        self.serialize: Callable[[], object] = serialize
+        self.delay: float = delay
+        self._is_dirty = False
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def mark_dirty(self) -> None:
+        self._is_dirty = True
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        """Keeps flushing while changes come during a flush, or a flush failed."""
+        while self._is_dirty:
+            await asyncio.sleep(self.delay)
+            await self.flush()
+
+    async def flush(self) -> None:
+        if not self._is_dirty:
+            return
+        self._is_dirty = False
+        content = self.serialize()
+        try:
+            await asyncio.to_thread(dump_json_atomically, self.path, content)
+        except OSError as e:
+            self._is_dirty = True  # Retried after the delay.
+            logger.warning(f"Failed to save settings to {self.path}. {e}")
+
+    def close(self) -> None:
+        """Write pending changes synchronously. Call this on shutdown, when the event loop may not run tasks."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        if self._is_dirty:
+            dump_json_atomically(self.path, self.serialize())
+            self._is_dirty = False
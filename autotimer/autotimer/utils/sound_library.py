@@ -0,0 +1,106 @@
+"""
+Sounds transcoded to Opus once, and played from memory without spawning ffmpeg for each playback.
+"""
+import asyncio
+import logging
+import subprocess
+from pathlib import Path
+from typing import Dict, Sequence, Tuple
+
+import discord
+from discord.oggparse import OggStream
+
+logger = logging.getLogger(__name__)
+
+OPUS_HEADERS = (b"OpusHead", b"OpusTags")  # Not audio. Packets starting with these are skipped.
+
+
+def transcode_to_ogg_opus(source: Path, destination: Path, bitrate: int = 128) -> None:
+    """Same encoding as discord.FFmpegOpusAudio does for each playback."""
+    args = ["ffmpeg", "-y", "-loglevel", "warning", "-i", str(source),
+            "-map_metadata", "-1", "-f", "opus", "-c:a", "libopus",
+            "-ar", "48000", "-ac", "2", "-b:a", f"{bitrate}k", str(destination)]
+    subprocess.run(args, check=True, stdin=subprocess.DEVNULL)
+
+
+def read_opus_packets(path: Path) -> Tuple[bytes, ...]:
+    with path.open(mode="rb") as f:
+        return tuple(packet for packet in OggStream(f).iter_packets() if not packet.startswith(OPUS_HEADERS))
+
+
+class OpusPacketSource(discord.AudioSource):
+    """Plays Opus packets in memory. Packets are shared between sources, so creating a source costs nothing."""
+
+    def __init__(self, packets: Sequence[bytes]) -> None:
+        self._packets: Sequence[bytes] = packets
+        self._index = 0
+
+    def read(self) -> bytes:
+        if self._index >= len(self._packets):
+            return b""
+        packet = self._packets[self._index]
+        self._index += 1
+        return packet
+
+    def is_opus(self) -> bool:
+        return True
+
+
+class SoundLibrary:
+    """
+    Keeps sounds as Opus packets in memory, transcoded on load and cached on disk as Ogg files.
+
+    Examples
+    --------
+    sounds = SoundLibrary()
+    sounds.register("chime", Path("sound/chime_5sec.wav"))
+    await sounds.load()
+    voice_client.play(sounds.get_source("chime"))
+    """
+    DEFAULT_CACHE_DIR = Path() / "sound_cache"
+    BITRATE = 128
+
+    def __init__(self, cache_dir: Path = DEFAULT_CACHE_DIR) -> None:
+        self.cache_dir: Path = cache_dir
+        self._paths: Dict[str, Path] = {}
+        self._packets: Dict[str, Tuple[bytes, ...]] = {}
+
+    def register(self, name: str, path: Path) -> None:
+        self._paths[name] = path
+        self._packets.pop(name, None)
+
+    def get_cache_path(self, path: Path) -> Path:
+        return self.cache_dir / f"{path.stem}.opus.ogg"
+
+    def _load_packets(self, path: Path) -> Tuple[bytes, ...]:
+        """Blocking. Transcodes only if cached file is missing or older than the source."""
+        if path.suffix in (".ogg", ".opus"):
+            return read_opus_packets(path)
+        cache_path = self.get_cache_path(path)
+        if not cache_path.exists() or cache_path.stat().st_mtime < path.stat().st_mtime:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            temp_path = cache_path.with_name(cache_path.name + ".tmp")
+            transcode_to_ogg_opus(path, temp_path, self.BITRATE)
+            temp_path.replace(cache_path)
+        return read_opus_packets(cache_path)
+
+    async def load(self) -> None:
+        """Load all registered sounds concurrently. Sounds failed to load are logged and left unloaded."""
+        names = [name for name in self._paths if name not in self._packets]
+        results = await asyncio.gather(*(asyncio.to_thread(self._load_packets, self._paths[name]) for name in names),
+                                       return_exceptions=True)
+        for name, result in zip(names, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Failed to load sound {name} from {self._paths[name]}. {result}")
+            else:
+                self._packets[name] = result
+
+    def get_source(self, name: str) -> discord.AudioSource:
+        """Falls back to transcoding by ffmpeg on playback if the sound is not loaded."""
+        try:
+            return OpusPacketSource(self._packets[name])
+        except KeyError:
+            return discord.FFmpegOpusAudio(str(self._paths[name]))
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._paths
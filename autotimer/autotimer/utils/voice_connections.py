@@ -0,0 +1,140 @@
+import asyncio
+import logging
+from typing import Dict, Optional, Tuple
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+QueueItem = Tuple[discord.VoiceChannel, discord.AudioSource, asyncio.Future]
+
+
+class VoiceConnectionManager:
+    """
+    Keeps 1 voice connection per guild, and plays sounds queued for the guild one by one.
+
+    The connection is reused while sounds keep coming, moved if the next sound is for other channel,
+    and disconnected after idle_seconds without sounds.
+
+    Examples
+    --------
+    voice_connections = VoiceConnectionManager()
+    voice_connections.enqueue(voice_channel, source)
+    await voice_connections.play(voice_channel, source)  # Waits for the sound to finish.
+    """
+    DEFAULT_IDLE_SECONDS = 60.0
+
+    def __init__(self, idle_seconds: float = DEFAULT_IDLE_SECONDS) -> None:
+        self.idle_seconds: float = idle_seconds
+        self._queues: Dict[int, asyncio.Queue] = {}
+        self._workers: Dict[int, asyncio.Task] = {}
+        self._retiring: Dict[int, asyncio.Task] = {}  # Workers disconnecting after idle, by guild id.
+
+    def enqueue(self, voice_channel: discord.VoiceChannel, source: discord.AudioSource) -> asyncio.Future:
+        """Returns future which is done when the sound finishes, or cancelled if the guild is disconnected."""
+        guild_id = voice_channel.guild.id
+        future = asyncio.get_running_loop().create_future()
+        queue = self._queues.get(guild_id)
+        if queue is None:
+            queue = self._queues[guild_id] = asyncio.Queue()
+            previous = self._retiring.get(guild_id)
+            self._workers[guild_id] = asyncio.create_task(self._work(voice_channel.guild, queue, previous))
+        queue.put_nowait((voice_channel, source, future))
+        return future
+
+    async def play(self, voice_channel: discord.VoiceChannel, source: discord.AudioSource) -> None:
+        await self.enqueue(voice_channel, source)
+
+    async def _work(self, guild: discord.Guild, queue: asyncio.Queue, previous: Optional[asyncio.Task] = None) -> None:
+        """Starts after the previous worker of the guild disconnected, so its connection is never reused."""
+        try:
+            if previous is not None:
+                await asyncio.wait({previous})
+            while True:
+                try:
+                    item: QueueItem = await asyncio.wait_for(queue.get(), self.idle_seconds)
+                except asyncio.TimeoutError:
+                    break
+                await self._play_item(item)
+        finally:
+            # Removed before disconnecting, so sounds enqueued from now on start a new worker, which waits for this.
+            current = asyncio.current_task()
+            if self._workers.get(guild.id) is current:
+                del self._workers[guild.id]
+                del self._queues[guild.id]
+                self._retiring[guild.id] = current
+            for _, _, future in drain(queue):
+                future.cancel()
+            try:
+                await self._disconnect(guild)
+            finally:
+                if self._retiring.get(guild.id) is current:
+                    del self._retiring[guild.id]
+
+    async def _play_item(self, item: QueueItem) -> None:
+        """Errors are logged, not raised to callers. Nobody may wait for the sound."""
+        voice_channel, source, future = item
+        if future.cancelled():
+            return
+        try:
+            voice_client = await self._connect(voice_channel)
+            finished = asyncio.get_running_loop().create_future()
+
+            def after(error: Optional[Exception]) -> None:  # Called in the thread of the player.
+                finished.get_loop().call_soon_threadsafe(finish, error)
+
+            def finish(error: Optional[Exception]) -> None:
+                if not finished.done():
+                    finished.set_result(error)
+
+            voice_client.play(source, after=after)
+            error = await finished
+            if error:
+                logger.warning(f"Error while playing sound in {voice_channel.name}. {error}")
+        except (discord.errors.ClientException, asyncio.TimeoutError) as e:
+            logger.warning(f"Failed to play sound in {voice_channel.name}. {e}")
+        finally:
+            if not future.done():
+                future.set_result(None)
+
+    @staticmethod
+    async def _connect(voice_channel: discord.VoiceChannel) -> discord.VoiceClient:
+        voice_client: Optional[discord.VoiceClient] = voice_channel.guild.voice_client
+        if voice_client is not None and voice_client.is_connected():
+            if voice_client.channel != voice_channel:
+                await voice_client.move_to(voice_channel)
+            return voice_client
+        if voice_client is not None:
+            await voice_client.disconnect(force=True)
+        return await voice_channel.connect()
+
+    @staticmethod
+    async def _disconnect(guild: discord.Guild) -> None:
+        voice_client = guild.voice_client
+        if voice_client is not None:
+            await voice_client.disconnect(force=True)
+
+    async def disconnect(self, guild: discord.Guild) -> None:
+        """Stop sounds queued for the guild and disconnect now."""
+        worker = self._workers.get(guild.id)
+        if worker is not None:
+            worker.cancel()
+            try:
+                await worker
+            except asyncio.CancelledError:
+                pass
+        else:
+            await self._disconnect(guild)
+
+    async def close(self) -> None:
+        workers = list(self._workers.values())
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, *self._retiring.values(), return_exceptions=True)
+
+
+def drain(queue: asyncio.Queue) -> list:
+    items = []
+    while not queue.empty():
+        items.append(queue.get_nowait())
+    return items
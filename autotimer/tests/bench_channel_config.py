@@ -0,0 +1,80 @@
+"""
+Compare startup and lookup time of channel configs between pandas DataFrame and ChannelConfigStore.
+
+    python tests/bench_channel_config.py [--rows 1000] [--lookups 10000]
+pandas is only needed for the baseline, which is skipped if it is not installed.
+"""
+import argparse
+import json
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "autotimer"))
+from utils.channel_config import ChannelConfig, ChannelConfigStore  # noqa: E402
+
+
+def make_settings(path: Path, rows: int) -> list:
+    store = ChannelConfigStore()
+    for i in range(rows):
+        store.add(ChannelConfig(vc=10 ** 17 + i, tc=2 * 10 ** 17 + i, work_minutes=30.0, break_minutes=5.0))
+    store.dump(path)
+    return [config.vc for config in store]
+
+
+def measure_import(module: str) -> float:
+    """Import in new process, since the module may be already imported in this one."""
+    code = (f"import sys, time; sys.path[:0] = {sys.path[:1]!r}; start = time.perf_counter(); "
+            f"import {module}; print(time.perf_counter() - start)")
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    if result.returncode:
+        raise ImportError(result.stderr)
+    return float(result.stdout)
+
+
+def bench_pandas(path: Path, keys: list) -> None:
+    from pandas import DataFrame  # Same lookup as HurryCog._get_data had done.
+    start = time.perf_counter()
+    with path.open() as f:
+        db = DataFrame(json.load(f))
+    loaded = time.perf_counter()
+    for vc_id in keys:
+        filtered_df = db.query(f"vc == {vc_id}")
+        filtered_df.work_minutes.iloc[0]
+    finished = time.perf_counter()
+    print(f"pandas: import {measure_import('pandas'):.3f}s, load {loaded - start:.4f}s, "
+          f"{(finished - loaded) / len(keys) * 1e6:.1f}us per lookup")
+
+
+def bench_store(path: Path, keys: list) -> None:
+    start = time.perf_counter()
+    store = ChannelConfigStore.load(path)
+    loaded = time.perf_counter()
+    for vc_id in keys:
+        store.get_by_vc(vc_id).work_minutes
+    finished = time.perf_counter()
+    print(f"store: import {measure_import('utils.channel_config'):.3f}s, load {loaded - start:.4f}s, "
+          f"{(finished - loaded) / len(keys) * 1e6:.3f}us per lookup")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--lookups", type=int, default=10000)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / "channels_settings.json"
+        vc_ids = make_settings(path, args.rows)
+        keys = [random.choice(vc_ids) for _ in range(args.lookups)]
+        bench_store(path, keys)
+        try:
+            bench_pandas(path, keys[:max(1, args.lookups // 100)])  # query is too slow to repeat as many.
+        except ImportError:
+            print("pandas is not installed. Skipped the baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "autotimer"))
+from cogs.voice_text_linker import ChannelLinks  # noqa: E402
+from utils.channel_config import ChannelConfig, ChannelConfigStore  # noqa: E402
+
+
+class TestLinks(unittest.TestCase):
+    """ChannelConfigStore is used as the index of links instead of ChannelLinks, so both must behave the same."""
+
+    def make_indexes(self):
+        return ChannelLinks(), ChannelConfigStore()
+
+    def test_update_from_json_keys(self):
+        for links in self.make_indexes():
+            links.update({"1": "10", "2": "20"})
+            self.assertEqual(links.get_tc_id(1), 10)
+            self.assertEqual(links.get_vc_id(20), 2)
+            self.assertEqual(set(links.vc_ids), {1, 2})
+
+    def test_relink_replaces_both_sides(self):
+        for links in self.make_indexes():
+            links.link(1, 10)
+            links.link(2, 20)
+            links.link(1, 20)
+            self.assertEqual(links.get_tc_id(1), 20)
+            self.assertIsNone(links.get_tc_id(2))
+            self.assertIsNone(links.get_vc_id(10))
+            self.assertEqual(set(links.vc_ids), {1})
+
+    def test_unknown_channel(self):
+        for links in self.make_indexes():
+            self.assertIsNone(links.get_tc_id(1))
+            self.assertIsNone(links.get_vc_id(1))
+
+
+class TestChannelConfigStore(unittest.TestCase):
+    def test_relink_keeps_minutes_of_voice_channel(self):
+        store = ChannelConfigStore()
+        store.add(ChannelConfig(vc=1, tc=10, work_minutes=25.0, break_minutes=5.0))
+        store.link(1, 11)
+        config = store.get_by_vc(1)
+        self.assertEqual((config.tc, config.work_minutes, config.break_minutes), (11, 25.0, 5.0))
+        self.assertIsNone(store.get_by_tc(10))
+
+    def test_columns_round_trip(self):
+        store = ChannelConfigStore()
+        store.add(ChannelConfig(vc=1, tc=10, work_minutes=25.0))
+        store.add(ChannelConfig(vc=2, tc=20))
+        loaded = ChannelConfigStore.from_columns(store.to_columns())
+        self.assertEqual(list(loaded), list(store))
+
+
+if __name__ == "__main__":
+    unittest.main()
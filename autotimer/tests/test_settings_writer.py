@@ -0,0 +1,83 @@
+import asyncio
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "autotimer"))
+from utils.settings_writer import DebouncedJsonWriter  # noqa: E402
+
+DELAY = 0.01
+
+
+class TestDebouncedJsonWriter(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.path = Path(temp_dir.name) / "settings.json"
+        self.settings = {}
+        self.serialized_count = 0
+        self.writer = DebouncedJsonWriter(self.path, self.serialize, delay=DELAY)
+
+    def serialize(self):
+        self.serialized_count += 1
+        return dict(self.settings)
+
+    def read(self):
+        with self.path.open() as f:
+            return json.load(f)
+
+    async def wait_flushed(self):
+        for _ in range(100):
+            task = self.writer._flush_task
+            if task is None or task.done():
+                return
+            await asyncio.sleep(DELAY)
+        self.fail("The writer kept flushing.")
+
+    async def test_burst_is_written_once(self):
+        for i in range(10):
+            self.settings["key"] = i
+            self.writer.mark_dirty()
+        await self.wait_flushed()
+        self.assertEqual(self.serialized_count, 1)
+        self.assertEqual(self.read(), {"key": 9})
+
+    async def test_change_during_flush_is_flushed_again(self):
+        def serialize():
+            content = self.serialize()
+            if self.serialized_count == 1:  # Changed while the first content is being written.
+                self.settings["key"] = "changed"
+                self.writer.mark_dirty()
+            return content
+
+        self.writer.serialize = serialize
+        self.settings["key"] = "first"
+        self.writer.mark_dirty()
+        await self.wait_flushed()
+        self.assertEqual(self.serialized_count, 2)
+        self.assertEqual(self.read(), {"key": "changed"})
+
+    async def test_failed_flush_is_retried(self):
+        self.writer.path = self.path.parent / "missing" / "settings.json"
+        self.settings["key"] = "value"
+        with self.assertLogs("utils.settings_writer", level="WARNING"):
+            self.writer.mark_dirty()
+            while self.serialized_count == 0 or not self.writer._is_dirty:  # Till the first flush fails.
+                await asyncio.sleep(DELAY / 10)
+            self.writer.path.parent.mkdir()
+        await self.wait_flushed()
+        with self.writer.path.open() as f:
+            self.assertEqual(json.load(f), {"key": "value"})
+
+    async def test_close_writes_pending_changes(self):
+        self.settings["key"] = "value"
+        self.writer.mark_dirty()
+        self.writer.close()
+        self.assertEqual(self.read(), {"key": "value"})
+        self.assertIsNone(self.writer._flush_task)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "autotimer"))
+from utils.voice_connections import VoiceConnectionManager  # noqa: E402
+
+IDLE_SECONDS = 0.02
+DISCONNECT_SECONDS = 0.1
+
+
+class FakeVoiceClient:
+    def __init__(self, guild, channel):
+        self.guild = guild
+        self.channel = channel
+        self.played = []
+        self.connected = True
+
+    def is_connected(self):
+        return self.connected
+
+    def play(self, source, after):
+        self.played.append(source)
+        asyncio.get_running_loop().call_soon(after, None)
+
+    async def disconnect(self, force=False):
+        await asyncio.sleep(DISCONNECT_SECONDS)
+        self.connected = False
+        self.guild.voice_client = None
+
+
+class FakeVoiceChannel:
+    def __init__(self, guild):
+        self.guild = guild
+        self.name = "voice"
+
+    async def connect(self):
+        voice_client = self.guild.voice_client = FakeVoiceClient(self.guild, self)
+        self.guild.voice_clients.append(voice_client)
+        return voice_client
+
+
+class TestVoiceConnectionManager(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.guild = SimpleNamespace(id=1, voice_client=None, voice_clients=[])
+        self.voice_channel = FakeVoiceChannel(self.guild)
+        self.manager = VoiceConnectionManager(idle_seconds=IDLE_SECONDS)
+
+    async def asyncTearDown(self):
+        await self.manager.close()
+
+    async def test_connection_is_reused_while_sounds_keep_coming(self):
+        await self.manager.play(self.voice_channel, "first")
+        await self.manager.play(self.voice_channel, "second")
+        self.assertEqual(len(self.guild.voice_clients), 1)
+        self.assertEqual(self.guild.voice_clients[0].played, ["first", "second"])
+
+    async def test_sound_enqueued_while_disconnecting_after_idle_plays_on_new_connection(self):
+        await self.manager.play(self.voice_channel, "first")
+        await asyncio.sleep(IDLE_SECONDS + DISCONNECT_SECONDS / 2)  # The worker is disconnecting now.
+        old_voice_client = self.guild.voice_client
+        self.assertIsNotNone(old_voice_client)
+
+        await asyncio.wait_for(self.manager.play(self.voice_channel, "second"), 1)
+        self.assertEqual(old_voice_client.played, ["first"])
+        self.assertEqual(len(self.guild.voice_clients), 2)
+        new_voice_client = self.guild.voice_clients[1]
+        self.assertEqual(new_voice_client.played, ["second"])
+        self.assertTrue(new_voice_client.is_connected())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import asyncio
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+from discord.ext.commands import Cog
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "autotimer"))
+from cogs.voice_text_linker import VoiceTextLinker  # noqa: E402
+
+DEBOUNCE_SECONDS = 0.05
+VC_ID, TC_ID = 1, 10
+
+
+class FakeBot:
+    def __init__(self):
+        self.channels = {VC_ID: SimpleNamespace(id=VC_ID, members=[]), TC_ID: SimpleNamespace(id=TC_ID)}
+
+    def get_channel(self, channel_id):
+        return self.channels.get(channel_id)
+
+
+class BotCog(Cog):
+    """Stands for the other base cogs of HurryCog, which take bot."""
+
+    def __init__(self, bot):
+        super().__init__()
+
+
+class Linker(VoiceTextLinker, BotCog):
+    def __init__(self, bot, setting_json_path: Path):
+        super().__init__(bot, db={VC_ID: TC_ID}, setting_json_path=str(setting_json_path), saves_settings=False,
+                         voice_debounce_seconds=DEBOUNCE_SECONDS)
+        self.events = []
+
+    async def on_connect_to_targeted_vc(self, member, connected_voice, textchannel):
+        self.events.append(("connect", member.name))
+
+    async def on_disconnect_from_targeted_vc(self, member, disconnected_voice, textchannel):
+        self.events.append(("disconnect", member.name))
+
+
+def make_member(name: str):
+    return SimpleNamespace(name=name, bot=False)
+
+
+class TestVoiceDebounce(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        path = Path(temp_dir.name) / "channels_settings.json"
+        path.write_text("{}")
+        self.bot = FakeBot()
+        self.linker = Linker(self.bot, path)
+        self.in_vc = SimpleNamespace(channel=self.bot.get_channel(VC_ID))
+        self.out_of_vc = SimpleNamespace(channel=None)
+
+    async def join(self, name: str):
+        await self.linker.on_voice_state_update(make_member(name), self.out_of_vc, self.in_vc)
+
+    async def leave(self, name: str):
+        await self.linker.on_voice_state_update(make_member(name), self.in_vc, self.out_of_vc)
+
+    async def wait_window(self):
+        await asyncio.sleep(DEBOUNCE_SECONDS * 3)
+
+    async def test_join_then_other_leaves_is_connect(self):
+        await self.join("A")
+        await self.join("B")
+        await self.leave("B")
+        await self.wait_window()
+        self.assertEqual([event for event, _ in self.linker.events], ["connect"])
+        self.assertEqual(self.linker.get_human_count(VC_ID), 1)
+
+    async def test_join_and_leave_is_nothing(self):
+        await self.join("A")
+        await self.leave("A")
+        await self.wait_window()
+        self.assertEqual(self.linker.events, [])
+
+    async def test_leaves_are_handled_once(self):
+        await self.join("A")
+        await self.join("B")
+        await self.wait_window()
+        await self.leave("A")
+        await self.leave("B")
+        await self.wait_window()
+        self.assertEqual(self.linker.events, [("connect", "B"), ("disconnect", "B")])
+
+    async def test_windows_are_cancelled_on_unload(self):
+        await self.join("A")
+        self.linker.cog_unload()
+        await self.wait_window()
+        self.assertEqual(self.linker.events, [])
+
+    async def test_no_debounce_handles_every_event(self):
+        self.linker.voice_debounce_seconds = 0
+        await self.join("A")
+        await self.leave("A")
+        self.assertEqual(self.linker.events, [("connect", "A"), ("disconnect", "A")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1 @@
+"""Manage custom emojis on discord with discord.py."""
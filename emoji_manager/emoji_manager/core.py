@@ -1,16 +1,19 @@
+import asyncio
 import json
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, replace
 from datetime import datetime
 from imghdr import what
 from logging import getLogger
 from pathlib import Path
 from textwrap import dedent
-from typing import Optional
+from typing import Iterable, Optional
 
 import discord
 from discord.ext.commands import command, Cog, Context
 
 from . import messaging
+from .manifest import Manifest, SyncPlan
+from .storage_pool import EmojiStoragePool
 
 logger = getLogger(__name__)
 
@@ -32,15 +35,29 @@ class ImageToEmojiCog(Cog):
     Therefore, you should manage custom emoji with local json file to specify emoji you exactly want.
     """
     DEFAULT_IMAGES_PATH = Path() / "images"
+    DEFAULT_WATCH_INTERVAL = 10  # seconds
 
     def __init__(self, bot,
-                 path_of_emoji_stats_json: Path = Path() / "emoji_stats.json"):
+                 path_of_emoji_stats_json: Path = Path() / "emoji_stats.json",
+                 storage_guild_ids: Iterable[int] = (),
+                 path_of_manifest_json: Path = Path() / "emoji_manifest.json"):
+        """
+        Parameters
+        ----------
+        storage_guild_ids : Iterable[int]
+            Ids of guilds to store emojis. If empty, emojis are registered in the guild invoked the command.
+        path_of_manifest_json : Path
+            Json file to remember stats of image files for sync command.
+        """
         super().__init__()
         self.bot: discord.ext.commands.Bot = bot
+        self.storage: EmojiStoragePool = EmojiStoragePool(bot, storage_guild_ids)
 
         self.emoji_data_list: list[EmojiData] = []
         self.emojis_json: Path = path_of_emoji_stats_json
         self._load_json()
+        self.manifest: Manifest = Manifest(path_of_manifest_json)
+        self._watch_tasks: dict[int, asyncio.Task] = {}
 
     def _load_json(self):
         if self.emojis_json.exists():
@@ -67,7 +84,7 @@ class ImageToEmojiCog(Cog):
         if emoji_data:
             emoji_data.sort(key=lambda x: x.created_at)
             emoji_id = emoji_data[0].id
-            return discord.utils.get(self.bot.emojis, id=emoji_id)
+            return self.bot.get_emoji(emoji_id)
 
         if emoji_data is None and path is not None:
             if path.exists():
@@ -75,6 +92,15 @@ class ImageToEmojiCog(Cog):
             else:
                 raise FileNotFoundError("Both of emoji and filepath are not found.")
 
+    def get_storage(self, guild: discord.Guild) -> EmojiStoragePool:
+        if self.storage.guild_ids:
+            return self.storage
+        return EmojiStoragePool(self.bot, [guild.id])
+
+    @Cog.listener()
+    async def on_guild_emojis_update(self, guild, before, after):
+        self.storage.on_guild_emojis_update(guild, before, after)
+
     @command()
     async def delete_your_emojis(self, ctx, reason=None):
         """Delete all emojis created by this bot."""
@@ -192,13 +218,12 @@ class ImageToEmojiCog(Cog):
             await ctx.send("Specified file must be directory of images or image file itself. ")
             return
 
-        def has_enough_capacity():
-            return (guild.emoji_limit - len(guild.emojis)) > len(images_path)
-
-        if not has_enough_capacity():
-            from textwrap import dedent
-            msgr = dedent("""
-                This server has no capacity to register all emojis in the image directory.
+        storage = self.get_storage(guild)
+        try:
+            placement = storage.plan(images_path)
+        except storage.NotEnoughCapacity as e:
+            msgr = dedent(f"""
+                Storage servers have no capacity to register all emojis in the image directory. {e}
                 You can delete many emojis easily with following commands.\n\n""")
             delete_commands = [self.delete_my_emojis, self.delete_your_emojis, self.delete_all_emojis]
             for command in delete_commands:
@@ -208,20 +233,20 @@ class ImageToEmojiCog(Cog):
         registering_message = await ctx.send("Registering emojis... This can take a few minutes.")
         registered: dict[discord.Emoji:Path] = {}
         failed: list[Path] = []
-        for image in images_path:
-            for _ in range(3):
-                try:
-                    emoji = await self._register(guild, image=image)
-                except discord.errors.HTTPException:
-                    pass
+        for storage_guild, images in placement.items():
+            for image in images:
+                for _ in range(3):
+                    try:
+                        emoji = await self._register(storage_guild, image=image)
+                    except discord.errors.HTTPException:
+                        pass
+                    else:
+                        registered[emoji] = image
+                        self.manifest.set(self.manifest.make_entry(image, emoji_id=emoji.id))
+                        break
                 else:
-                    emoji_data = EmojiData(id=emoji.id, name=emoji.name,
-                                           path=image, created_at=emoji.created_at)
-                    self.emoji_data_list.append(emoji_data)
-                    registered[emoji] = image
-                    break
-            else:
-                failed.append(image)
+                    failed.append(image)
+        self.manifest.dump()
         self._dump_json()
 
         if not registered:
@@ -241,6 +266,125 @@ class ImageToEmojiCog(Cog):
         await registering_message.delete()
         await msgr.send()
 
+    @command()
+    async def sync(self, ctx: Context, image_dir_path: str = None, watch: bool = False):
+        """
+        Registers only images added or changed since last sync, and deletes emojis of removed images.
+        If watch is True, keeps syncing the directory until stop_sync is invoked.
+        """
+        await self._validate_author(ctx)
+        validated_path = await self._validate_path(ctx, image_dir_path)
+        sent_message = await ctx.send("Syncing emojis... Wait for a while.")
+        try:
+            plan, failed = await self._sync(ctx.guild, validated_path)
+        except EmojiStoragePool.NotEnoughCapacity as e:
+            await sent_message.edit(content=f"Storage servers have no capacity to sync. {e}")
+            return
+        if plan:
+            content = f"Synced. {plan.summary()}"
+        else:
+            content = "Emojis are already synced."
+        if failed:
+            content += "\n\nFailed to register followings for some reason. Try once later.:\n"
+            content += "\n".join(failed)
+        await sent_message.edit(content=content)
+
+        if watch:
+            self._stop_watching(ctx.guild)
+            self._watch_tasks[ctx.guild.id] = asyncio.create_task(self._watch(ctx, validated_path))
+
+    @command()
+    async def stop_sync(self, ctx: Context):
+        """Stop watching the directory of images."""
+        if self._stop_watching(ctx.guild):
+            await ctx.send("Stopped watching images.")
+        else:
+            await ctx.send("No directory is watched in this server.")
+
+    def _stop_watching(self, guild: discord.Guild) -> bool:
+        task = self._watch_tasks.pop(guild.id, None)
+        if task is None:
+            return False
+        task.cancel()
+        return True
+
+    def cog_unload(self):
+        for task in self._watch_tasks.values():
+            task.cancel()
+
+    async def _watch(self, ctx: Context, image_dir: Path, interval: float = DEFAULT_WATCH_INTERVAL):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                plan, failed = await self._sync(ctx.guild, image_dir)
+            except (EmojiStoragePool.NotEnoughCapacity, discord.HTTPException) as e:
+                logger.warning(f"Failed to sync {image_dir}. {e}")
+                continue
+            if plan:
+                await ctx.send(f"Synced changes in {image_dir}. {plan.summary()}")
+
+    async def _sync(self, guild: discord.Guild, image_dir: Path) -> tuple[SyncPlan, list[str]]:
+        """
+        Apply only differences between image files and registered emojis.
+
+        Returns
+        -------
+        tuple[SyncPlan, list[str]]
+            Applied plan and paths failed to register.
+        """
+        scanned = await asyncio.to_thread(self.manifest.scan, image_dir)
+        plan = self.manifest.make_plan(scanned, image_dir,
+                                       is_alive=lambda emoji_id: self.bot.get_emoji(emoji_id) is not None)
+        for entry in plan.unchanged:
+            self.manifest.set(entry)  # mtime might be changed without change of content.
+        if not plan:
+            self.manifest.dump()
+            return plan, []
+
+        failed: list[str] = []
+        try:
+            for old in plan.delete + [old for old, _ in plan.replace]:
+                emoji = self.bot.get_emoji(old.emoji_id)
+                if emoji is not None:
+                    await self._delete_emoji(emoji, reason="The image was removed or replaced.")
+                self.manifest.remove(old)
+
+            to_register = plan.add + [new for _, new in plan.replace]
+            for old, new in plan.rename:
+                emoji = self.bot.get_emoji(old.emoji_id)
+                self.manifest.remove(old)
+                if emoji is None:  # Deleted on discord after the plan was made.
+                    to_register.append(replace(new, emoji_id=None))
+                    continue
+                if emoji.name != new.stem:
+                    try:
+                        emoji = await emoji.edit(name=new.stem)
+                    except discord.errors.HTTPException:
+                        self.manifest.set(old)  # Renamed again by next sync.
+                        failed.append(new.path)
+                        continue
+                for data in self.emoji_data_list:
+                    if data.id == emoji.id:
+                        data.name, data.path = emoji.name, Path(new.path)
+                self.manifest.set(new)
+
+            if to_register:
+                storage = self.get_storage(guild)
+                placement = storage.plan(Path(entry.path) for entry in to_register)
+                entries_by_path = {entry.path: entry for entry in to_register}
+                for storage_guild, images in placement.items():
+                    for image in images:
+                        try:
+                            emoji = await self._register(storage_guild, image=image)
+                        except discord.errors.HTTPException:
+                            failed.append(str(image))
+                        else:
+                            self.manifest.set(replace(entries_by_path[str(image)], emoji_id=emoji.id))
+        finally:
+            self.manifest.dump()
+            self._dump_json()
+        return plan, failed
+
     def _dump_json(self):
         for_json = []
         for data in self.emoji_data_list:
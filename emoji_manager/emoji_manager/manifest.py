@@ -0,0 +1,153 @@
+import json
+from dataclasses import dataclass, asdict, field, replace
+from hashlib import sha256
+from imghdr import what
+from logging import getLogger
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+logger = getLogger(__name__)
+
+
+@dataclass
+class ManifestEntry:
+    path: str
+    mtime: float
+    size: int
+    hash: str
+    emoji_id: Optional[int] = None
+
+    @property
+    def stem(self) -> str:
+        return Path(self.path).stem
+
+
+@dataclass
+class SyncPlan:
+    """Minimal operations to make registered emojis same as image files."""
+    add: list[ManifestEntry] = field(default_factory=list)
+    replace: list[tuple[ManifestEntry, ManifestEntry]] = field(default_factory=list)  # (old, new)
+    rename: list[tuple[ManifestEntry, ManifestEntry]] = field(default_factory=list)  # (old, new)
+    delete: list[ManifestEntry] = field(default_factory=list)
+    unchanged: list[ManifestEntry] = field(default_factory=list)
+
+    def __bool__(self):
+        return bool(self.add or self.replace or self.rename or self.delete)
+
+    def summary(self) -> str:
+        return (f"add: {len(self.add)}, replace: {len(self.replace)}, "
+                f"rename: {len(self.rename)}, delete: {len(self.delete)}")
+
+
+class Manifest:
+    """
+    Remembers image files which were registered as emoji, with their mtime, size and hash.
+
+    Only files whose mtime or size changed since last scan are read and hashed again,
+    so that scanning a large directory costs almost only stat calls.
+    """
+
+    def __init__(self, path: Path):
+        self.path: Path = path
+        self.entries: dict[str, ManifestEntry] = {}
+        self.load()
+
+    def load(self) -> None:
+        if self.path.exists():
+            with self.path.open(mode="r") as f:
+                self.entries = {data["path"]: ManifestEntry(**data) for data in json.load(f)}
+
+    def dump(self) -> None:
+        with self.path.open(mode="w") as f:
+            json.dump([asdict(entry) for entry in self.entries.values()], f)
+
+    def scan(self, image_dir: Path) -> dict[str, ManifestEntry]:
+        """Return current state of image files. Emoji ids are carried over from known entries."""
+        scanned: dict[str, ManifestEntry] = {}
+        for path in iter_files(image_dir):
+            stat = path.stat()
+            key = str(path)
+            known = self.entries.get(key)
+            if known and known.mtime == stat.st_mtime and known.size == stat.st_size:
+                scanned[key] = known
+                continue
+            if not what(path):  # Not an image.
+                continue
+            scanned[key] = ManifestEntry(path=key, mtime=stat.st_mtime, size=stat.st_size,
+                                         hash=hash_file(path), emoji_id=known and known.emoji_id)
+        return scanned
+
+    def make_plan(self, scanned: dict[str, ManifestEntry], image_dir: Path,
+                  is_alive: Callable[[int], bool]) -> SyncPlan:
+        """
+        Parameters
+        ----------
+        scanned : dict[str, ManifestEntry]
+            Result of scan().
+        image_dir : Path
+            Scanned directory. Entries of other directories are never deleted.
+        is_alive : Callable[[int], bool]
+            Returns if emoji of the id still exists on discord.
+            Entries whose emoji was deleted on discord side are registered again.
+        """
+        plan = SyncPlan()
+        vanished = {key: entry for key, entry in self.entries.items()
+                    if key not in scanned and is_under(Path(key), image_dir)}
+        vanished_by_hash: dict[str, ManifestEntry] = {}
+        for entry in vanished.values():
+            if entry.emoji_id is not None and is_alive(entry.emoji_id):
+                vanished_by_hash.setdefault(entry.hash, entry)
+
+        for key, entry in scanned.items():
+            old = self.entries.get(key)
+            if old is not None:
+                if old.emoji_id is None or not is_alive(old.emoji_id):
+                    plan.add.append(entry)
+                elif old.hash == entry.hash:
+                    plan.unchanged.append(replace(entry, emoji_id=old.emoji_id))
+                else:
+                    plan.replace.append((old, entry))
+                continue
+
+            moved_from = vanished_by_hash.pop(entry.hash, None)
+            if moved_from is not None:  # Same image was moved or renamed.
+                del vanished[moved_from.path]
+                plan.rename.append((moved_from, replace(entry, emoji_id=moved_from.emoji_id)))
+            else:
+                plan.add.append(entry)
+
+        for entry in vanished.values():
+            if entry.emoji_id is not None and is_alive(entry.emoji_id):
+                plan.delete.append(entry)
+        return plan
+
+    @staticmethod
+    def make_entry(path: Path, emoji_id: Optional[int] = None) -> ManifestEntry:
+        stat = path.stat()
+        return ManifestEntry(path=str(path), mtime=stat.st_mtime, size=stat.st_size,
+                             hash=hash_file(path), emoji_id=emoji_id)
+
+    def set(self, entry: ManifestEntry) -> None:
+        self.entries[entry.path] = entry
+
+    def remove(self, entry: ManifestEntry) -> None:
+        self.entries.pop(entry.path, None)
+
+
+def iter_files(_dir: Path) -> Iterator[Path]:
+    if _dir.is_file():
+        yield _dir
+        return
+    for obj in _dir.iterdir():
+        if obj.is_dir():
+            yield from iter_files(obj)
+        else:
+            yield obj
+
+
+def is_under(path: Path, _dir: Path) -> bool:
+    return path == _dir or _dir in path.parents
+
+
+def hash_file(path: Path) -> str:
+    return sha256(path.read_bytes()).hexdigest()
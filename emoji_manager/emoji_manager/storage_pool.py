@@ -0,0 +1,166 @@
+from collections.abc import Iterable
+from imghdr import what
+from logging import getLogger
+from pathlib import Path
+from typing import Optional
+
+import discord
+
+logger = getLogger(__name__)
+
+
+class EmojiStoragePool:
+    """
+    Treats some guilds as one big storage of custom emojis.
+
+    Static and animated emojis have separate limits on discord, so capacity is always counted per type.
+    Keeps an index from emoji name to emoji, so that emojis can be found in O(1)
+    whichever guild stores them.
+
+    Examples
+    --------
+    pool = EmojiStoragePool(bot, [853249947952087050, 564350361444286464])
+    emoji = await pool.create_custom_emoji(name="hourglass", image=image_bytes)
+    pool.get_emoji("hourglass")
+    """
+
+    def __init__(self, bot: discord.Client, guild_ids: Iterable[int]):
+        """
+        Parameters
+        ----------
+        bot : discord.Client
+        guild_ids : Iterable[int]
+            Ids of guilds to store emojis. Earlier guild is filled earlier.
+        """
+        self.bot: discord.Client = bot
+        self.guild_ids: list[int] = list(guild_ids)
+        self._index: Optional[dict[str, discord.Emoji]] = None
+
+    class NotEnoughCapacity(Exception):
+        pass
+
+    @property
+    def guilds(self) -> list[discord.Guild]:
+        """Storage guilds the bot can see now. Guilds not cached yet are skipped."""
+        guilds = []
+        for guild_id in self.guild_ids:
+            guild = self.bot.get_guild(guild_id)
+            if guild is not None:
+                guilds.append(guild)
+        return guilds
+
+    def add_guild(self, guild_id: int) -> None:
+        if guild_id not in self.guild_ids:
+            self.guild_ids.append(guild_id)
+            self._index = None
+
+    @staticmethod
+    def free_slots(guild: discord.Guild, animated: bool = False) -> int:
+        used = sum(1 for emoji in guild.emojis if emoji.animated == animated)
+        return guild.emoji_limit - used
+
+    def capacity(self, animated: bool = False) -> int:
+        """Count of emojis which can be registered in the pool from now."""
+        return sum(self.free_slots(guild, animated) for guild in self.guilds)
+
+    def pick_guild(self, animated: bool = False) -> discord.Guild:
+        """Return first guild which has room for the type of emoji."""
+        for guild in self.guilds:
+            if self.free_slots(guild, animated) > 0:
+                return guild
+        raise self.NotEnoughCapacity(f"All of storage guilds are full of {get_type_name(animated)} emojis.")
+
+    def plan(self, images: Iterable[Path]) -> dict[discord.Guild, list[Path]]:
+        """
+        Decide which guild stores each image, respecting limits of static and animated emojis separately.
+
+        Raises
+        ------
+        EmojiStoragePool.NotEnoughCapacity
+            If the pool cannot store all of images. Nothing is planned in that case.
+        """
+        placement: dict[discord.Guild, list[Path]] = {}
+        images_by_type: dict[bool, list[Path]] = {False: [], True: []}
+        for image in images:
+            images_by_type[is_animated_image(image)].append(image)
+
+        for animated, images_of_type in images_by_type.items():
+            remaining = images_of_type[::]
+            for guild in self.guilds:
+                if not remaining:
+                    break
+                free = self.free_slots(guild, animated)
+                if free <= 0:
+                    continue
+                placement.setdefault(guild, []).extend(remaining[:free])
+                remaining = remaining[free:]
+            if remaining:
+                raise self.NotEnoughCapacity(
+                    f"{len(remaining)} {get_type_name(animated)} emojis are beyond the capacity of storage guilds.")
+        return placement
+
+    async def create_custom_emoji(self, *, name: str, image: bytes, animated: bool = False,
+                                  guild: Optional[discord.Guild] = None, **kwargs) -> discord.Emoji:
+        """Register emoji in a storage guild which has room, and index it."""
+        guild = guild or self.pick_guild(animated)
+        emoji = await guild.create_custom_emoji(name=name, image=image, **kwargs)
+        self.index[emoji.name] = emoji
+        return emoji
+
+    async def delete_emoji(self, emoji: discord.Emoji, **kwargs) -> None:
+        await emoji.delete(**kwargs)
+        if self.index.get(emoji.name) == emoji:
+            del self.index[emoji.name]
+
+    @property
+    def index(self) -> dict[str, discord.Emoji]:
+        """Emoji name to emoji. Built lazily, since guilds are not available before the bot gets ready."""
+        if self._index is None:
+            guilds = self.guilds
+            if not guilds:
+                return {}  # Not cached to build it again after ready.
+            self._index = {}
+            for guild in guilds:
+                for emoji in guild.emojis:
+                    self._index.setdefault(emoji.name, emoji)
+        return self._index
+
+    def get_emoji(self, name: str) -> Optional[discord.Emoji]:
+        return self.index.get(name)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.index
+
+    def on_guild_emojis_update(self, guild: discord.Guild,
+                               before: Iterable[discord.Emoji], after: Iterable[discord.Emoji]) -> None:
+        """Keep the index current. Call this from listener of the same name."""
+        if guild.id not in self.guild_ids or self._index is None:
+            return
+        names_after = {emoji.id: emoji.name for emoji in after}
+        for emoji in before:
+            if names_after.get(emoji.id) == emoji.name:  # Neither deleted nor renamed.
+                continue
+            if self._index.get(emoji.name) == emoji:
+                del self._index[emoji.name]
+                # Other storage guild may have an emoji with the same name.
+                replacement = self._find_emoji(emoji.name, excluded_id=emoji.id)
+                if replacement is not None:
+                    self._index[emoji.name] = replacement
+        for emoji in after:
+            self._index.setdefault(emoji.name, emoji)
+
+    def _find_emoji(self, name: str, excluded_id: int) -> Optional[discord.Emoji]:
+        for guild in self.guilds:
+            for emoji in guild.emojis:
+                if emoji.name == name and emoji.id != excluded_id:
+                    return emoji
+        return None
+
+
+def is_animated_image(path: Path) -> bool:
+    """Discord registers gif as animated emoji."""
+    return what(path) == "gif"
+
+
+def get_type_name(animated: bool) -> str:
+    return "animated" if animated else "static"
@@ -0,0 +1,105 @@
+import tempfile
+import unittest
+from dataclasses import replace
+from pathlib import Path
+
+from emoji_manager.manifest import Manifest
+
+PNG_HEADER = b"\x89PNG\r\n\x1a\n"
+
+
+class TestMakePlan(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.root = Path(temp_dir.name)
+        self.manifest = Manifest(self.root / "manifest.json")
+        self.alive: set[int] = set()
+        self.next_id = 1
+
+    def write_image(self, path: Path, content: bytes) -> Path:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(PNG_HEADER + content)
+        return path
+
+    def sync(self, image_dir: Path):
+        """Apply the plan as ImageToEmojiCog._sync does, with fake emoji ids."""
+        plan = self.manifest.make_plan(self.manifest.scan(image_dir), image_dir, is_alive=self.alive.__contains__)
+        for entry in plan.unchanged:
+            self.manifest.set(entry)
+        for old in plan.delete + [old for old, _ in plan.replace]:
+            self.alive.discard(old.emoji_id)
+            self.manifest.remove(old)
+        for old, new in plan.rename:
+            self.manifest.remove(old)
+            self.manifest.set(new)
+        for entry in plan.add + [new for _, new in plan.replace]:
+            self.alive.add(self.next_id)
+            self.manifest.set(replace(entry, emoji_id=self.next_id))
+            self.next_id += 1
+        return plan
+
+    def test_syncing_two_directories_keeps_both(self):
+        first, second = self.root / "first", self.root / "second"
+        self.write_image(first / "a.png", b"a")
+        self.write_image(second / "b.png", b"b")
+        self.assertEqual(len(self.sync(first).add), 1)
+        self.assertEqual(len(self.sync(second).add), 1)
+
+        plan = self.sync(first)
+        self.assertFalse(plan)
+        self.assertEqual(plan.delete, [])
+        self.assertEqual(len(self.alive), 2)
+        self.assertFalse(self.sync(second))
+
+    def test_removed_image_is_deleted_only_from_its_directory(self):
+        first, second = self.root / "first", self.root / "second"
+        removed = self.write_image(first / "a.png", b"a")
+        self.write_image(second / "b.png", b"b")
+        self.sync(first)
+        self.sync(second)
+
+        removed.unlink()
+        self.assertEqual(self.sync(second).delete, [])
+        plan = self.sync(first)
+        self.assertEqual([entry.path for entry in plan.delete], [str(removed)])
+
+    def test_directory_with_similar_prefix_is_other_directory(self):
+        first, other = self.root / "emoji", self.root / "emoji_old"
+        self.write_image(first / "a.png", b"a")
+        self.write_image(other / "b.png", b"b")
+        self.sync(first)
+        self.sync(other)
+        self.assertEqual(self.sync(first).delete, [])
+
+    def test_moved_image_is_renamed(self):
+        image_dir = self.root / "images"
+        old_path = self.write_image(image_dir / "a.png", b"a")
+        self.sync(image_dir)
+        old_path.rename(image_dir / "renamed.png")
+
+        plan = self.sync(image_dir)
+        self.assertEqual(len(plan.rename), 1)
+        self.assertEqual(plan.rename[0][1].stem, "renamed")
+        self.assertEqual(plan.add, [])
+        self.assertEqual(plan.delete, [])
+
+    def test_changed_image_is_replaced(self):
+        image_dir = self.root / "images"
+        path = self.write_image(image_dir / "a.png", b"a")
+        self.sync(image_dir)
+        self.write_image(path, b"changed")
+
+        plan = self.sync(image_dir)
+        self.assertEqual(len(plan.replace), 1)
+
+    def test_emoji_deleted_on_discord_is_added_again(self):
+        image_dir = self.root / "images"
+        self.write_image(image_dir / "a.png", b"a")
+        self.sync(image_dir)
+        self.alive.clear()
+        self.assertEqual(len(self.sync(image_dir).add), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+from dataclasses import dataclass, field
+
+from emoji_manager.storage_pool import EmojiStoragePool
+
+
+@dataclass(eq=False)
+class FakeEmoji:
+    id: int
+    name: str
+    animated: bool = False
+
+    def __eq__(self, other):  # Same as discord.Emoji, which is equal by id.
+        return isinstance(other, FakeEmoji) and self.id == other.id
+
+    def __hash__(self):
+        return self.id >> 22
+
+
+@dataclass
+class FakeGuild:
+    id: int
+    emojis: list = field(default_factory=list)
+    emoji_limit: int = 50
+
+
+class FakeBot:
+    def __init__(self, *guilds: FakeGuild):
+        self.guilds = {guild.id: guild for guild in guilds}
+
+    def get_guild(self, guild_id):
+        return self.guilds.get(guild_id)
+
+
+class TestIndex(unittest.TestCase):
+    def setUp(self):
+        self.first = FakeGuild(1, [FakeEmoji(11, "hourglass"), FakeEmoji(12, "chime")])
+        self.second = FakeGuild(2, [FakeEmoji(21, "hourglass")])
+        self.pool = EmojiStoragePool(FakeBot(self.first, self.second), [1, 2])
+
+    def update(self, guild: FakeGuild, emojis: list):
+        before, guild.emojis = guild.emojis, emojis
+        self.pool.on_guild_emojis_update(guild, before, emojis)
+
+    def test_earlier_guild_wins(self):
+        self.assertEqual(self.pool.get_emoji("hourglass").id, 11)
+
+    def test_deleting_emoji_not_indexed_keeps_index(self):
+        self.pool.index
+        self.update(self.second, [])
+        self.assertEqual(self.pool.get_emoji("hourglass").id, 11)
+
+    def test_deleting_indexed_emoji_falls_back_to_other_guild(self):
+        self.pool.index
+        self.update(self.first, [self.first.emojis[1]])
+        self.assertEqual(self.pool.get_emoji("hourglass").id, 21)
+        self.assertEqual(self.pool.get_emoji("chime").id, 12)
+
+    def test_renamed_emoji_is_reindexed(self):
+        self.pool.index
+        self.update(self.first, [FakeEmoji(11, "sandglass"), self.first.emojis[1]])
+        self.assertEqual(self.pool.get_emoji("sandglass").id, 11)
+        self.assertEqual(self.pool.get_emoji("hourglass").id, 21)
+
+    def test_deleting_last_emoji_of_name(self):
+        self.pool.index
+        self.update(self.first, [self.first.emojis[0]])
+        self.assertNotIn("chime", self.pool)
+
+    def test_other_guild_is_ignored(self):
+        self.pool.index
+        self.pool.on_guild_emojis_update(FakeGuild(3), [FakeEmoji(11, "hourglass")], [])
+        self.assertEqual(self.pool.get_emoji("hourglass").id, 11)
+
+
+if __name__ == "__main__":
+    unittest.main()